@@ -0,0 +1,75 @@
+"""
+Background tasks owned by the app lifecycle
+Keeps a reference to every spawned task so it is not garbage collected mid-flight
+and logs failures instead of losing them
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Coroutine, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_tasks: Set[asyncio.Task] = set()
+
+
+def _on_done(task: asyncio.Task):
+    _tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(f"Background task {task.get_name()} failed: {error!r}")
+
+
+def spawn(coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+    """Run a coroutine in the background without awaiting it"""
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+async def _repeat(fn: Callable[[], Awaitable], interval: float, name: str):
+    while True:
+        try:
+            await fn()
+        except Exception as e:
+            logger.error(f"Periodic task {name} failed: {e!r}")
+        await asyncio.sleep(interval)
+
+
+def every(interval: float, fn: Callable[[], Awaitable], name: str) -> asyncio.Task:
+    """Call fn() now and then every `interval` seconds; a failed run does not stop the loop"""
+    return spawn(_repeat(fn, interval, name), name=name)
+
+
+class Periodic:
+    """
+    Base for components that run one job every `interval` seconds, from the app's
+    startup hook (start) until its shutdown hook (stop)
+    With enabled=False, start() does nothing (e.g. the component is not configured)
+    """
+
+    def __init__(self, job: Callable[[], Awaitable], interval: float, name: str, enabled: bool = True):
+        self._job = job
+        self._interval = interval
+        self._task_name = name
+        self._enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._enabled and self._task is None:
+            self._task = every(self._interval, self._job, name=self._task_name)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+async def cancel_all():
+    """Cancel every running background task (called from the app shutdown hook)"""
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
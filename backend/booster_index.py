@@ -0,0 +1,118 @@
+"""
+In-memory index of guild members holding a booster role
+Built once from a paged member sweep, then kept current from members seen in
+interactions and periodic diffed sweeps (the app has no gateway connection, so
+there is no member event feed)
+"""
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from background import Periodic
+from discord_bot import get_config, fetch_guild_members_page
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+class BoosterIndex(Periodic):
+    """
+    Maps Discord user id -> booster roles held, for members with at least one
+    Count is O(1), listing is O(k) in the number of boosters
+    """
+
+    def __init__(self, role_ids: Iterable[str], sweep_interval: float = 900.0, max_pages: int = 100):
+        self.role_ids: FrozenSet[str] = frozenset(r.strip() for r in role_ids if r.strip())
+        self.sweep_interval = sweep_interval
+        self.max_pages = max_pages
+        self.members: Dict[str, Dict] = {}
+        # With no booster roles configured the (empty) index is complete from the start
+        self.ready = not self.role_ids
+        super().__init__(self.sweep, sweep_interval, name="booster-index-sweep", enabled=bool(self.role_ids))
+        # Members applied while a sweep is paging; they are newer than what the sweep read
+        self._seen_during_sweep: Optional[Dict[str, Optional[Dict]]] = None
+
+    def has_booster_role(self, roles: Iterable[str]) -> bool:
+        return not self.role_ids.isdisjoint(roles)
+
+    def _entry(self, member: Dict) -> Optional[Dict]:
+        roles = self.role_ids.intersection(member.get("roles", []))
+        if not roles:
+            return None
+        user = member.get("user", {})
+        return {
+            "id": user.get("id"),
+            "username": user.get("global_name") or user.get("username"),
+            "roles": sorted(roles)
+        }
+
+    def apply_member(self, member: Dict):
+        """Member object seen in an interaction"""
+        user_id = member.get("user", {}).get("id")
+        if not user_id:
+            return
+        entry = self._entry(member)
+        if entry:
+            self.members[user_id] = entry
+        else:
+            self.members.pop(user_id, None)
+        if self._seen_during_sweep is not None:
+            self._seen_during_sweep[user_id] = entry
+
+    def count(self) -> int:
+        return len(self.members)
+
+    def list(self) -> List[Dict]:
+        return list(self.members.values())
+
+    def contains(self, user_id: Optional[str]) -> bool:
+        return user_id in self.members
+
+    async def sweep(self) -> bool:
+        """
+        Page through the member list and diff it against the index
+        Only booster members are kept, so memory stays O(boosters) per page
+        Returns False (index unchanged) when Discord could not be read
+        """
+        guild_id = get_config()['guild_id']
+        if not self.role_ids or not guild_id:
+            return False
+
+        found: Dict[str, Dict] = {}
+        after = "0"
+        scanned = 0
+        self._seen_during_sweep = {}
+        try:
+            for _ in range(self.max_pages):
+                page = await fetch_guild_members_page(guild_id, after=after, limit=PAGE_SIZE)
+                if page is None:
+                    return False
+                if not page:
+                    break
+                scanned += len(page)
+                for member in page:
+                    entry = self._entry(member)
+                    if entry:
+                        found[entry["id"]] = entry
+                after = page[-1]["user"]["id"]
+                if len(page) < PAGE_SIZE:
+                    break
+            seen = self._seen_during_sweep
+        finally:
+            self._seen_during_sweep = None
+
+        # Members applied while paging win over the (older) page they were read from
+        for user_id, entry in seen.items():
+            if entry:
+                found[user_id] = entry
+            else:
+                found.pop(user_id, None)
+
+        added = found.keys() - self.members.keys()
+        removed = self.members.keys() - found.keys()
+        for user_id in removed:
+            del self.members[user_id]
+        self.members.update(found)
+        self.ready = True
+        logger.info(f"Booster index sweep: {len(found)} boosters from {scanned} members (+{len(added)} / -{len(removed)})")
+        return True
@@ -0,0 +1,57 @@
+"""
+Per-booster order statistics for GET /admin/boosters
+One aggregation over orders grouped by booster_id; optionally materialized into
+the `booster_stats` collection on an interval so a request is a single find
+"""
+import logging
+from typing import Dict
+
+from background import Periodic
+
+logger = logging.getLogger(__name__)
+
+COMPLETED = {"$eq": ["$status", "completed"]}
+IN_PROGRESS = {"$eq": ["$status", "in_progress"]}
+
+PIPELINE = [
+    {"$match": {"booster_id": {"$ne": None}, "status": {"$in": ["completed", "in_progress"]}}},
+    {"$group": {
+        "_id": "$booster_id",
+        "orders_completed": {"$sum": {"$cond": [COMPLETED, 1, 0]}},
+        "orders_in_progress": {"$sum": {"$cond": [IN_PROGRESS, 1, 0]}},
+        "revenue": {"$sum": {"$cond": [COMPLETED, "$price", 0]}}
+    }}
+]
+
+EMPTY = {"orders_completed": 0, "orders_in_progress": 0, "revenue": 0}
+
+
+class BoosterStats(Periodic):
+    """
+    booster_id -> {orders_completed, orders_in_progress, revenue}
+    Revenue is the sum of completed order prices (USD)
+    When materialized, figures can lag behind orders by up to refresh_interval
+    """
+
+    def __init__(self, db, materialized: bool = False, refresh_interval: float = 300.0):
+        self.orders = db.orders
+        self.collection = db.booster_stats
+        self.materialized = materialized
+        self.refresh_interval = refresh_interval
+        super().__init__(self.refresh, refresh_interval, name="booster-stats-refresh", enabled=materialized)
+
+    async def refresh(self):
+        """Rewrite the materialized collection ($out replaces it in one step)"""
+        await self.orders.aggregate(PIPELINE + [{"$out": self.collection.name}]).to_list(None)
+        logger.info("Refreshed booster stats")
+
+    async def by_booster(self) -> Dict[str, Dict]:
+        if self.materialized:
+            rows = await self.collection.find().to_list(None)
+        else:
+            rows = await self.orders.aggregate(PIPELINE).to_list(None)
+        return {
+            row["_id"]: {key: row.get(key, 0) for key in EMPTY}
+            for row in rows
+        }
+
@@ -0,0 +1,115 @@
+"""
+Slash command registration off the startup path
+The command list is hashed and compared with the hash stored in Mongo (`sync_state`,
+_id "slash_commands"); only a change triggers the bulk PUT, and a lease makes sure
+one worker does it per deploy
+"""
+import uuid
+import json
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from discord_bot import get_config, register_slash_commands, SLASH_COMMANDS
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = "slash_commands"
+
+
+def commands_hash(commands: List[Dict], guild_id: str) -> str:
+    canonical = json.dumps({"guild_id": guild_id, "commands": commands}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CommandSync:
+    """
+    Runs in the background until the current command list is registered (or already was)
+    Failed attempts are retried with backoff; the lease expires if a worker dies mid-way
+    """
+
+    def __init__(self, db, commands: List[Dict] = SLASH_COMMANDS, lease_seconds: float = 60.0, max_backoff: float = 300.0):
+        self.sync_state = db.sync_state
+        self.commands = commands
+        self.lease_seconds = lease_seconds
+        self.max_backoff = max_backoff
+        self.owner = str(uuid.uuid4())
+
+    async def _claim(self, digest: str) -> bool:
+        """Take the lease unless the hash is already registered or another worker holds it"""
+        now = datetime.utcnow()
+        try:
+            doc = await self.sync_state.find_one_and_update(
+                {
+                    "_id": STATE_ID,
+                    "hash": {"$ne": digest},
+                    "$or": [{"lease_until": None}, {"lease_until": {"$lte": now}}]
+                },
+                {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The state document exists but did not match: up to date, or leased
+            return False
+        return doc is not None and doc.get("owner") == self.owner
+
+    async def sync(self) -> bool:
+        """
+        Register the commands if their hash changed
+        Returns True once the current hash is registered (by this or an earlier run)
+        """
+        config = get_config()
+        if not config['bot_token'] or not config['guild_id']:
+            logger.warning("Discord credentials not configured, slash commands not registered")
+            return True
+        digest = commands_hash(self.commands, config['guild_id'])
+
+        state = await self.sync_state.find_one({"_id": STATE_ID})
+        if state and state.get("hash") == digest:
+            logger.info("Slash commands unchanged, skipping registration")
+            return True
+
+        if not await self._claim(digest):
+            # Another worker is registering them; check back in case it fails or dies
+            logger.info("Slash commands are being registered by another worker")
+            return False
+
+        registered = await register_slash_commands(self.commands)
+        update = {"lease_until": None}
+        if registered:
+            update.update({"hash": digest, "registered_at": datetime.utcnow()})
+        await self.sync_state.update_one({"_id": STATE_ID, "owner": self.owner}, {"$set": update})
+        return registered
+
+    async def force(self) -> bool:
+        """Register now regardless of the stored hash (admin endpoint)"""
+        config = get_config()
+        registered = await register_slash_commands(self.commands)
+        if registered:
+            await self.sync_state.update_one(
+                {"_id": STATE_ID},
+                {"$set": {
+                    "hash": commands_hash(self.commands, config['guild_id'] or ""),
+                    "registered_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        return registered
+
+    async def run(self):
+        """Background task: retry until the commands are registered"""
+        delay = 15.0
+        while True:
+            try:
+                if await self.sync():
+                    return
+            except Exception as e:
+                logger.error(f"Slash command sync failed: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
@@ -0,0 +1,129 @@
+"""
+USD exchange rates for GET /currency/rates
+Refreshed by a background task ahead of expiry, never from the request path;
+the last good rates are kept in Mongo (`currency_rates`) so new workers start warm
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import httpx
+from fastapi import Request, Response
+
+from background import Periodic
+from static_payload import StaticPayload
+
+logger = logging.getLogger(__name__)
+
+RATES_URL = "https://api.exchangerate-api.com/v4/latest/USD"
+
+# Served until the first successful fetch (or load from Mongo)
+FALLBACK_RATES = {
+    "USD": 1, "EUR": 0.92, "GBP": 0.79, "CAD": 1.36, "AUD": 1.53,
+    "JPY": 149.50, "INR": 83.12, "BRL": 4.97, "MXN": 17.15,
+    "CNY": 7.24, "KRW": 1298.50, "PHP": 55.80, "SGD": 1.34
+}
+
+
+class CurrencyRates(Periodic):
+    """
+    Rates are refetched once they are older than ttl - refresh_ahead
+    Before calling upstream, a refresh adopts newer rates another worker stored in Mongo
+    """
+
+    def __init__(
+        self,
+        db,
+        ttl: float = 3600.0,
+        refresh_ahead: float = 300.0,
+        check_interval: float = 60.0,
+        max_age: int = 300,
+        url: str = RATES_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.collection = db.currency_rates
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.url = url
+        self.transport = transport
+        self.fetched_at: Optional[datetime] = None
+        self.rates: Dict = FALLBACK_RATES
+        self.updated = datetime.utcnow().isoformat()
+        # Bumped whenever the rates change, for tables derived from them (pricing.PriceMatrix)
+        self.version = 0
+        self.payload = self._build(FALLBACK_RATES, self.updated)
+        self.upstream_fetches = 0
+        self._inflight: Optional[asyncio.Task] = None
+        super().__init__(self.refresh_if_due, check_interval, name="currency-rates-refresh")
+
+    def _build(self, rates: Dict, updated: str) -> StaticPayload:
+        return StaticPayload(
+            {"base": "USD", "rates": rates, "updated": updated},
+            max_age=self.max_age
+        )
+
+    def _adopt(self, rates: Dict, fetched_at: datetime):
+        self.rates = rates
+        self.updated = fetched_at.isoformat()
+        self.payload = self._build(rates, self.updated)
+        self.fetched_at = fetched_at
+        self.version += 1
+
+    def _due(self, fetched_at: Optional[datetime]) -> bool:
+        if fetched_at is None:
+            return True
+        return datetime.utcnow() - fetched_at >= timedelta(seconds=self.ttl - self.refresh_ahead)
+
+    async def refresh_if_due(self):
+        if not self._due(self.fetched_at):
+            return
+        stored = await self.collection.find_one({"_id": "USD"})
+        if stored and (self.fetched_at is None or stored["fetched_at"] > self.fetched_at):
+            self._adopt(stored["rates"], stored["fetched_at"])
+            if not self._due(self.fetched_at):
+                return
+        await self.refresh()
+
+    async def refresh(self) -> bool:
+        """Fetch from upstream; concurrent callers share the one fetch in flight"""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(lambda _: setattr(self, "_inflight", None))
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> bool:
+        self.upstream_fetches += 1
+        try:
+            async with httpx.AsyncClient(transport=self.transport) as client:
+                response = await client.get(self.url, timeout=10.0)
+            if response.status_code != 200:
+                logger.error(f"Error fetching exchange rates: HTTP {response.status_code}")
+                return False
+            rates = response.json().get("rates") or {}
+            if not rates:
+                logger.error("Exchange rates response had no rates")
+                return False
+        except Exception as e:
+            logger.error(f"Error fetching exchange rates: {e}")
+            return False
+
+        # Mongo keeps milliseconds; store and serve the same timestamp
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        self._adopt(rates, now)
+        try:
+            await self.collection.update_one(
+                {"_id": "USD"},
+                {"$set": {"rates": rates, "fetched_at": now}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist exchange rates: {e}")
+        logger.info(f"Refreshed exchange rates ({len(rates)} currencies)")
+        return True
+
+    def response(self, request: Request) -> Response:
+        return self.payload.response(request)
@@ -1,23 +1,33 @@
 """
 Discord Bot Service for The Rival Syndicate
-Handles ticket creation and vouches fetching
+Handles ticket creation, vouch parsing and slash command interactions
 """
 import os
-import httpx
+import asyncio
 import logging
-from typing import Optional, List, Dict
+from functools import lru_cache
+from typing import Optional, List, Dict, Callable, Awaitable
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+from discord_client import discord_client
+from circuit_breaker import CircuitOpenError
+from background import spawn
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 logger = logging.getLogger(__name__)
 
-DISCORD_API = "https://discord.com/api/v10"
+# Upper bound for reads that back public pages (guild info, channel messages)
+READ_DEADLINE = float(os.environ.get('DISCORD_READ_DEADLINE', 2.0))
+
+# DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE, only visible to the invoking user
+DEFERRED_EPHEMERAL_RESPONSE = {"type": 5, "data": {"flags": 64}}
 
+@lru_cache(maxsize=1)
 def get_config():
     return {
         "bot_token": os.environ.get('DISCORD_BOT_TOKEN'),
@@ -28,24 +38,25 @@ def get_config():
         "booster_role_ids": os.environ.get('DISCORD_BOOSTER_ROLE_IDS', '').split(',')
     }
 
-def get_headers():
-    config = get_config()
-    return {
-        "Authorization": f"Bot {config['bot_token']}",
-        "Content-Type": "application/json"
-    }
-
 async def create_ticket_channel(
     order_id: str,
     discord_username: str,
     discord_id: str,
     character_name: str,
     service_type: str,
-    price: float
+    price: float,
+    channel: Optional[Dict] = None,
+    on_created: Optional[Callable[[Dict], Awaitable]] = None,
+    find_existing: bool = False,
+    deadline: Optional[float] = None
 ) -> Optional[Dict]:
     """
     Create a ticket channel for an order under the specified category
     Adds booster roles with access to the channel
+    Retries never create a second channel: `channel` is one an earlier attempt created
+    (only the welcome message is sent), `on_created` is awaited as soon as the channel
+    exists, and with `find_existing` a channel of the same name is looked up first
+    `deadline` bounds each Discord call (see DiscordClient.request)
     """
     config = get_config()
     if not config['bot_token'] or not config['guild_id'] or not config['ticket_category_id']:
@@ -87,71 +98,80 @@ async def create_ticket_channel(
                 "allow": full_access  # Full access for boosters
             })
         
-        async with httpx.AsyncClient() as client:
-            # Create the channel
-            response = await client.post(
-                f"{DISCORD_API}/guilds/{config['guild_id']}/channels",
-                headers=get_headers(),
+        # An earlier attempt may have created the channel without recording it
+        if channel is None and find_existing:
+            response = await discord_client.get(f"/guilds/{config['guild_id']}/channels", deadline=deadline)
+            if response.status_code != 200:
+                logger.error(f"Failed to list channels: {response.status_code} - {response.text}")
+                return None
+            for existing in response.json():
+                if existing.get("name") == channel_name and existing.get("parent_id") == config['ticket_category_id']:
+                    channel = {"channel_id": existing["id"], "channel_name": channel_name}
+                    break
+        
+        # Create the channel
+        if channel is None:
+            response = await discord_client.post(
+                f"/guilds/{config['guild_id']}/channels",
                 json={
                     "name": channel_name,
                     "type": 0,  # Text channel
                     "parent_id": config['ticket_category_id'],
                     "permission_overwrites": permission_overwrites,
                     "topic": f"Order #{order_id[:8]} | {character_name} | {service_type}"
-                }
+                },
+                deadline=deadline
             )
-            
-            if response.status_code == 201:
-                channel_data = response.json()
-                channel_id = channel_data.get("id")
-                
-                # Build mention string for booster roles
-                booster_mentions = " ".join([f"<@&{role_id}>" for role_id in booster_role_ids])
-                
-                # Send initial message to the channel
-                service_display = "Priority Farm" if service_type == "priority-farm" else "Lord Boosting"
-                embed = {
-                    "title": "🎮 New Order Created",
-                    "color": 65489,  # Cyan color (#00FFD1)
-                    "fields": [
-                        {"name": "Customer", "value": f"<@{discord_id}>" if discord_id else discord_username, "inline": True},
-                        {"name": "Character", "value": character_name, "inline": True},
-                        {"name": "Service", "value": service_display, "inline": True},
-                        {"name": "Price", "value": f"${price}", "inline": True},
-                        {"name": "Order ID", "value": f"`{order_id[:8]}`", "inline": True},
-                        {"name": "Status", "value": "⏳ Pending Payment", "inline": True}
-                    ],
-                    "footer": {"text": "The Rival Syndicate • Use /complete when order is done"},
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-                # Welcome message with customer and booster pings
-                welcome_content = f"<@{discord_id}> Welcome to your order ticket!" if discord_id else f"Welcome {discord_username}!"
-                if booster_mentions:
-                    welcome_content += f"\n\n**Boosters:** {booster_mentions}"
-                
-                await client.post(
-                    f"{DISCORD_API}/channels/{channel_id}/messages",
-                    headers=get_headers(),
-                    json={
-                        "content": welcome_content,
-                        "embeds": [embed],
-                        "allowed_mentions": {
-                            "users": [discord_id] if discord_id else [],
-                            "roles": booster_role_ids
-                        }
-                    }
-                )
-                
-                logger.info(f"Created ticket channel: {channel_name} with {len(booster_role_ids)} booster roles")
-                return {
-                    "channel_id": channel_id,
-                    "channel_name": channel_name
-                }
-            else:
+            if response.status_code != 201:
                 logger.error(f"Failed to create channel: {response.status_code} - {response.text}")
                 return None
-                
+            channel = {"channel_id": response.json().get("id"), "channel_name": channel_name}
+            if on_created:
+                await on_created(channel)
+        
+        channel_id = channel["channel_id"]
+        
+        # Build mention string for booster roles
+        booster_mentions = " ".join([f"<@&{role_id}>" for role_id in booster_role_ids])
+        
+        # Send initial message to the channel
+        service_display = "Priority Farm" if service_type == "priority-farm" else "Lord Boosting"
+        embed = {
+            "title": "🎮 New Order Created",
+            "color": 65489,  # Cyan color (#00FFD1)
+            "fields": [
+                {"name": "Customer", "value": f"<@{discord_id}>" if discord_id else discord_username, "inline": True},
+                {"name": "Character", "value": character_name, "inline": True},
+                {"name": "Service", "value": service_display, "inline": True},
+                {"name": "Price", "value": f"${price}", "inline": True},
+                {"name": "Order ID", "value": f"`{order_id[:8]}`", "inline": True},
+                {"name": "Status", "value": "⏳ Pending Payment", "inline": True}
+            ],
+            "footer": {"text": "The Rival Syndicate • Use /complete when order is done"},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        # Welcome message with customer and booster pings
+        welcome_content = f"<@{discord_id}> Welcome to your order ticket!" if discord_id else f"Welcome {discord_username}!"
+        if booster_mentions:
+            welcome_content += f"\n\n**Boosters:** {booster_mentions}"
+        
+        await discord_client.post(
+            f"/channels/{channel_id}/messages",
+            json={
+                "content": welcome_content,
+                "embeds": [embed],
+                "allowed_mentions": {
+                    "users": [discord_id] if discord_id else [],
+                    "roles": booster_role_ids
+                }
+            },
+            deadline=deadline
+        )
+        
+        logger.info(f"Created ticket channel: {channel_name} with {len(booster_role_ids)} booster roles")
+        return channel
+    
     except Exception as e:
         logger.error(f"Error creating ticket channel: {e}")
         return None
@@ -163,94 +183,97 @@ async def send_ticket_update(channel_id: str, message: str, embed_data: Optional
         return None
     
     try:
-        async with httpx.AsyncClient() as client:
-            payload = {"content": message}
-            if embed_data:
-                payload["embeds"] = [embed_data]
-            
-            response = await client.post(
-                f"{DISCORD_API}/channels/{channel_id}/messages",
-                headers=get_headers(),
-                json=payload
-            )
-            return response.status_code == 200
+        payload = {"content": message}
+        if embed_data:
+            payload["embeds"] = [embed_data]
+        
+        response = await discord_client.post(
+            f"/channels/{channel_id}/messages",
+            json=payload
+        )
+        return response.status_code == 200
     except Exception as e:
         logger.error(f"Error sending ticket update: {e}")
         return False
 
-async def fetch_vouches(limit: int = 50) -> List[Dict]:
+def parse_vouch(msg: Dict) -> Optional[Dict]:
     """
-    Fetch vouches/feedback messages from the vouches channel
+    Turn a message from the vouches channel into a vouch
     Handles both text vouches and mention-based vouches (where users tag who they vouch for)
+    Returns None for messages that are not vouches (bot messages, empty messages)
+    """
+    # Skip bot messages
+    if msg.get("author", {}).get("bot"):
+        return None
+    
+    author = msg.get("author", {})
+    content = msg.get("content", "")
+    mentions = msg.get("mentions", [])
+    
+    # Build vouch content - either from text or from mentions
+    vouch_content = content
+    mentioned_users = []
+    
+    if mentions:
+        # Extract mentioned user names
+        for mention in mentions:
+            display_name = mention.get("global_name") or mention.get("username", "Unknown")
+            mentioned_users.append(display_name)
+        
+        # If no text content but has mentions, create a vouch description
+        if not content.strip() and mentioned_users:
+            vouch_content = f"Vouched for: {', '.join(mentioned_users)}"
+    
+    # Skip if still no content (no text and no mentions)
+    if not vouch_content.strip():
+        return None
+    
+    # Get author display name
+    author_display = author.get("global_name") or author.get("username", "Unknown")
+    
+    return {
+        "id": msg.get("id"),
+        "content": vouch_content[:500],  # Limit content length
+        "author": {
+            "username": author_display,
+            "avatar": f"https://cdn.discordapp.com/avatars/{author.get('id')}/{author.get('avatar')}.png" if author.get("avatar") else None,
+            "id": author.get("id")
+        },
+        "timestamp": msg.get("timestamp"),
+        "attachments": [a.get("url") for a in msg.get("attachments", [])[:3]],  # Max 3 attachments
+        "mentioned_users": mentioned_users
+    }
+
+async def fetch_channel_messages(channel_id: str, after: Optional[str] = None, limit: int = 100) -> Optional[List[Dict]]:
+    """
+    Fetch one page of raw messages from a channel
+    With `after`, returns messages newer than that snowflake; otherwise the latest ones
+    Returns None when the request fails
     """
     config = get_config()
-    if not config['bot_token'] or not config['vouches_channel_id']:
-        logger.error("Discord bot credentials not configured for vouches")
-        return []
+    if not config['bot_token'] or not channel_id:
+        logger.error("Discord bot credentials not configured for channel messages")
+        return None
+    
+    params = {"limit": limit}
+    if after:
+        params["after"] = after
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{DISCORD_API}/channels/{config['vouches_channel_id']}/messages",
-                headers=get_headers(),
-                params={"limit": limit}
-            )
-            
-            if response.status_code == 200:
-                messages = response.json()
-                vouches = []
-                
-                for msg in messages:
-                    # Skip bot messages
-                    if msg.get("author", {}).get("bot"):
-                        continue
-                    
-                    author = msg.get("author", {})
-                    content = msg.get("content", "")
-                    mentions = msg.get("mentions", [])
-                    
-                    # Build vouch content - either from text or from mentions
-                    vouch_content = content
-                    mentioned_users = []
-                    
-                    if mentions:
-                        # Extract mentioned user names
-                        for mention in mentions:
-                            display_name = mention.get("global_name") or mention.get("username", "Unknown")
-                            mentioned_users.append(display_name)
-                        
-                        # If no text content but has mentions, create a vouch description
-                        if not content.strip() and mentioned_users:
-                            vouch_content = f"Vouched for: {', '.join(mentioned_users)}"
-                    
-                    # Skip if still no content (no text and no mentions)
-                    if not vouch_content.strip():
-                        continue
-                    
-                    # Get author display name
-                    author_display = author.get("global_name") or author.get("username", "Unknown")
-                    
-                    vouches.append({
-                        "id": msg.get("id"),
-                        "content": vouch_content[:500],  # Limit content length
-                        "author": {
-                            "username": author_display,
-                            "avatar": f"https://cdn.discordapp.com/avatars/{author.get('id')}/{author.get('avatar')}.png" if author.get("avatar") else None,
-                            "id": author.get("id")
-                        },
-                        "timestamp": msg.get("timestamp"),
-                        "attachments": [a.get("url") for a in msg.get("attachments", [])[:3]],  # Max 3 attachments
-                        "mentioned_users": mentioned_users
-                    })
-                
-                return vouches
-            else:
-                logger.error(f"Failed to fetch vouches: {response.status_code} - {response.text}")
-                return []
-                
+        response = await discord_client.get(f"/channels/{channel_id}/messages", params=params, deadline=READ_DEADLINE)
+        if response.status_code == 200:
+            return response.json()
+        logger.error(f"Failed to fetch messages: {response.status_code} - {response.text}")
+        return None
+    except CircuitOpenError:
+        logger.debug("Skipped fetching channel messages, circuit open")
+        return None
+    except asyncio.TimeoutError:
+        logger.error(f"Timed out fetching channel messages after {READ_DEADLINE}s")
+        return None
     except Exception as e:
-        logger.error(f"Error fetching vouches: {e}")
-        return []
+        logger.error(f"Error fetching channel messages: {e}")
+        return None
 
 async def get_guild_info() -> Optional[Dict]:
     """Get basic guild information including member count"""
@@ -260,127 +283,110 @@ async def get_guild_info() -> Optional[Dict]:
         return None
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{DISCORD_API}/guilds/{config['guild_id']}?with_counts=true",
-                headers=get_headers()
-            )
-            
-            if response.status_code == 200:
-                guild = response.json()
-                return {
-                    "name": guild.get("name"),
-                    "icon": f"https://cdn.discordapp.com/icons/{config['guild_id']}/{guild.get('icon')}.png" if guild.get("icon") else None,
-                    "member_count": guild.get("approximate_member_count", 0),
-                    "online_count": guild.get("approximate_presence_count", 0)
-                }
-            else:
-                logger.error(f"Failed to fetch guild info: {response.status_code} - {response.text}")
-            return None
+        response = await discord_client.get(
+            f"/guilds/{config['guild_id']}",
+            params={"with_counts": "true"},
+            deadline=READ_DEADLINE
+        )
+        
+        if response.status_code == 200:
+            guild = response.json()
+            return {
+                "name": guild.get("name"),
+                "icon": f"https://cdn.discordapp.com/icons/{config['guild_id']}/{guild.get('icon')}.png" if guild.get("icon") else None,
+                "member_count": guild.get("approximate_member_count", 0),
+                "online_count": guild.get("approximate_presence_count", 0)
+            }
+        else:
+            logger.error(f"Failed to fetch guild info: {response.status_code} - {response.text}")
+        return None
+    except CircuitOpenError:
+        logger.debug("Skipped fetching guild info, circuit open")
+        return None
+    except asyncio.TimeoutError:
+        logger.error(f"Timed out fetching guild info after {READ_DEADLINE}s")
+        return None
     except Exception as e:
         logger.error(f"Error fetching guild info: {e}")
         return None
 
-async def get_orders_count() -> int:
-    """Get count of messages in orders channel (completed orders)"""
+async def get_orders_count(max_pages: Optional[int] = None) -> Optional[int]:
+    """
+    Count the messages in the orders channel (one per completed order)
+    Pages through the whole channel unless max_pages is given; used to backfill
+    the completed orders counter
+    Returns None when Discord could not be read or is not configured, so the
+    backfill is retried on a later start instead of seeding 0
+    """
     config = get_config()
     if not config['bot_token'] or not config['orders_channel_id']:
         logger.error("Discord bot credentials not configured for orders count")
-        return 0
+        return None
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch messages from orders channel (up to 100 at a time)
-            # We'll count total messages as completed orders
-            total_count = 0
-            last_id = None
+        # Fetch messages from orders channel (up to 100 at a time)
+        # We'll count total messages as completed orders
+        total_count = 0
+        last_id = None
+        pages = 0
+        
+        while max_pages is None or pages < max_pages:
+            pages += 1
+            params = {"limit": 100}
+            if last_id:
+                params["before"] = last_id
             
-            # Fetch up to 500 messages (5 requests)
-            for _ in range(5):
-                params = {"limit": 100}
-                if last_id:
-                    params["before"] = last_id
-                
-                response = await client.get(
-                    f"{DISCORD_API}/channels/{config['orders_channel_id']}/messages",
-                    headers=get_headers(),
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    messages = response.json()
-                    if not messages:
-                        break
-                    total_count += len(messages)
-                    last_id = messages[-1]["id"]
-                    if len(messages) < 100:
-                        break
-                else:
-                    logger.error(f"Failed to fetch orders: {response.status_code} - {response.text}")
-                    break
+            response = await discord_client.get(
+                f"/channels/{config['orders_channel_id']}/messages",
+                params=params
+            )
             
-            return total_count
+            if response.status_code == 200:
+                messages = response.json()
+                if not messages:
+                    break
+                total_count += len(messages)
+                last_id = messages[-1]["id"]
+                if len(messages) < 100:
+                    break
+            else:
+                logger.error(f"Failed to fetch orders: {response.status_code} - {response.text}")
+                return None
+        
+        return total_count
     except Exception as e:
         logger.error(f"Error fetching orders count: {e}")
-        return 0
+        return None
 
-async def get_active_boosters_count() -> int:
+async def fetch_guild_members_page(guild_id: str, after: str = "0", limit: int = 1000) -> Optional[List[Dict]]:
     """
-    Get count of members who have any of the booster role IDs
+    Fetch one page of guild members (ordered by user id, starting after `after`)
     Requires Server Members Intent enabled on Discord Bot settings
+    Returns None when the page could not be read
     """
     config = get_config()
-    if not config['bot_token'] or not config['guild_id']:
-        logger.error("Discord bot credentials not configured for booster count")
-        return 0
-    
-    booster_role_ids = [r.strip() for r in config['booster_role_ids'] if r.strip()]
-    if not booster_role_ids:
-        logger.warning("No booster role IDs configured")
-        return 0
+    if not config['bot_token'] or not guild_id:
+        logger.error("Discord bot credentials not configured for guild members")
+        return None
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Paginate through all members
-            all_members = []
-            after = "0"
-            
-            for _ in range(10):  # Max 10 requests = 10,000 members
-                response = await client.get(
-                    f"{DISCORD_API}/guilds/{config['guild_id']}/members",
-                    headers=get_headers(),
-                    params={"limit": 1000, "after": after}
-                )
-                
-                if response.status_code == 403:
-                    logger.warning("Bot lacks Server Members Intent - cannot count boosters by role")
-                    return 0
-                
-                if response.status_code == 200:
-                    members = response.json()
-                    if not members:
-                        break
-                    all_members.extend(members)
-                    after = members[-1]["user"]["id"]
-                    if len(members) < 1000:
-                        break
-                else:
-                    logger.error(f"Failed to fetch members: {response.status_code} - {response.text}")
-                    break
-            
-            # Count members with any booster role
-            booster_count = 0
-            for member in all_members:
-                member_roles = member.get("roles", [])
-                if any(role_id in member_roles for role_id in booster_role_ids):
-                    booster_count += 1
-            
-            logger.info(f"Found {booster_count} active boosters from {len(all_members)} total members")
-            return booster_count
-            
+        response = await discord_client.get(
+            f"/guilds/{guild_id}/members",
+            params={"limit": limit, "after": after}
+        )
+        
+        if response.status_code == 403:
+            logger.warning("Bot lacks Server Members Intent - cannot list members")
+            return None
+        
+        if response.status_code == 200:
+            return response.json()
+        
+        logger.error(f"Failed to fetch members: {response.status_code} - {response.text}")
+        return None
     except Exception as e:
-        logger.error(f"Error fetching booster count: {e}")
-        return 0
+        logger.error(f"Error fetching guild members: {e}")
+        return None
 
 
 async def close_ticket_channel(channel_id: str, closed_by: str = "Staff") -> bool:
@@ -394,107 +400,170 @@ async def close_ticket_channel(channel_id: str, closed_by: str = "Staff") -> boo
         return False
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Send closing message
-            embed = {
-                "title": "🔒 Ticket Closed",
-                "description": f"This ticket has been closed by **{closed_by}**.\n\nThank you for using The Rival Syndicate!",
-                "color": 65489,  # Cyan
-                "footer": {"text": "The Rival Syndicate"},
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            await client.post(
-                f"{DISCORD_API}/channels/{channel_id}/messages",
-                headers=get_headers(),
-                json={"embeds": [embed]}
-            )
-            
-            # Wait a moment for message to send
-            import asyncio
-            await asyncio.sleep(1)
-            
-            # Delete the channel
-            response = await client.delete(
-                f"{DISCORD_API}/channels/{channel_id}",
-                headers=get_headers()
-            )
+        # Send closing message
+        embed = {
+            "title": "🔒 Ticket Closed",
+            "description": f"This ticket has been closed by **{closed_by}**.\n\nThank you for using The Rival Syndicate!",
+            "color": 65489,  # Cyan
+            "footer": {"text": "The Rival Syndicate"},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        await discord_client.post(
+            f"/channels/{channel_id}/messages",
+            json={"embeds": [embed]}
+        )
+        
+        # Wait a moment for message to send
+        await asyncio.sleep(1)
+        
+        # Delete the channel
+        response = await discord_client.delete(f"/channels/{channel_id}")
+        
+        if response.status_code in [200, 204]:
+            logger.info(f"Ticket channel {channel_id} closed by {closed_by}")
+            return True
+        else:
+            logger.error(f"Failed to delete channel: {response.status_code} - {response.text}")
+            return False
             
-            if response.status_code in [200, 204]:
-                logger.info(f"Ticket channel {channel_id} closed by {closed_by}")
-                return True
-            else:
-                logger.error(f"Failed to delete channel: {response.status_code} - {response.text}")
-                return False
-                
     except Exception as e:
         logger.error(f"Error closing ticket channel: {e}")
         return False
 
 
-async def register_slash_commands() -> bool:
+# Guild slash commands, registered by command_sync when this list changes
+SLASH_COMMANDS = [
+    {
+        "name": "close",
+        "description": "Close this ticket channel (Boosters/Admins only)",
+        "type": 1  # CHAT_INPUT
+    },
+    {
+        "name": "complete",
+        "description": "Mark the order as completed and close the ticket",
+        "type": 1
+    }
+]
+
+async def register_slash_commands(commands: List[Dict] = SLASH_COMMANDS) -> bool:
     """
-    Register slash commands with Discord
-    Should be called once on startup or when commands change
+    Register slash commands with Discord in one bulk overwrite
+    Commands missing from the list are removed from the guild
     """
     config = get_config()
     if not config['bot_token'] or not config['guild_id']:
         logger.error("Discord credentials not configured for slash commands")
         return False
     
-    # Get application ID from bot token
     try:
-        async with httpx.AsyncClient() as client:
-            # Get bot application info
-            app_response = await client.get(
-                f"{DISCORD_API}/oauth2/applications/@me",
-                headers=get_headers()
-            )
-            
-            if app_response.status_code != 200:
-                logger.error(f"Failed to get application info: {app_response.text}")
-                return False
-            
-            app_id = app_response.json().get("id")
-            
-            # Define slash commands
-            commands = [
-                {
-                    "name": "close",
-                    "description": "Close this ticket channel (Boosters/Admins only)",
-                    "type": 1  # CHAT_INPUT
-                },
-                {
-                    "name": "complete",
-                    "description": "Mark the order as completed and close the ticket",
-                    "type": 1
-                }
-            ]
-            
-            # Register commands for the guild
-            for cmd in commands:
-                response = await client.post(
-                    f"{DISCORD_API}/applications/{app_id}/guilds/{config['guild_id']}/commands",
-                    headers=get_headers(),
-                    json=cmd
-                )
-                
-                if response.status_code in [200, 201]:
-                    logger.info(f"Registered slash command: /{cmd['name']}")
-                else:
-                    logger.error(f"Failed to register /{cmd['name']}: {response.status_code} - {response.text}")
-            
+        # Get application ID from bot token
+        app_response = await discord_client.get("/oauth2/applications/@me")
+        
+        if app_response.status_code != 200:
+            logger.error(f"Failed to get application info: {app_response.text}")
+            return False
+        
+        app_id = app_response.json().get("id")
+        
+        response = await discord_client.put(
+            f"/applications/{app_id}/guilds/{config['guild_id']}/commands",
+            json=commands
+        )
+        
+        if response.status_code == 200:
+            logger.info(f"Registered slash commands: {', '.join('/' + cmd['name'] for cmd in commands)}")
             return True
-            
+        
+        logger.error(f"Failed to register slash commands: {response.status_code} - {response.text}")
+        return False
+        
     except Exception as e:
         logger.error(f"Error registering slash commands: {e}")
         return False
 
 
-async def handle_interaction(interaction_data: dict) -> dict:
+async def send_interaction_followup(interaction_data: dict, content: str, edit_original: bool = True) -> bool:
+    """
+    Send the result of a deferred interaction through its webhook
+    Edits the deferred "thinking..." response, or posts a new follow-up message
+    """
+    application_id = interaction_data.get("application_id")
+    token = interaction_data.get("token")
+    if not application_id or not token:
+        logger.error("Interaction is missing application_id/token, cannot send follow-up")
+        return False
+    
+    try:
+        if edit_original:
+            response = await discord_client.patch(
+                f"/webhooks/{application_id}/{token}/messages/@original",
+                json={"content": content}
+            )
+        else:
+            response = await discord_client.post(
+                f"/webhooks/{application_id}/{token}",
+                json={"content": content, "flags": 64}
+            )
+        return response.status_code in [200, 204]
+    except Exception as e:
+        logger.error(f"Error sending interaction follow-up: {e}")
+        return False
+
+
+async def _finish_close(interaction_data: dict, channel_id: str, username: str):
+    """Background part of /close: reply first, since the channel is deleted afterwards"""
+    await send_interaction_followup(interaction_data, "✅ Closing ticket...")
+    success = await close_ticket_channel(channel_id, username)
+    if not success:
+        await send_interaction_followup(
+            interaction_data,
+            "❌ Failed to close ticket. Please try again or delete manually.",
+            edit_original=False
+        )
+
+
+async def _finish_complete(
+    interaction_data: dict,
+    channel_id: str,
+    username: str,
+    on_complete: Optional[Callable[[str], Awaitable[None]]]
+):
+    """Background part of /complete: announce, update the order, then close after a delay"""
+    embed = {
+        "title": "✅ Order Completed!",
+        "description": f"Your order has been marked as **completed** by **{username}**.\n\nThank you for choosing The Rival Syndicate!\n\nThis ticket will close in 5 seconds...",
+        "color": 65489,
+        "footer": {"text": "The Rival Syndicate"},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    # Post the announcement and update the order at the same time
+    steps = [discord_client.post(f"/channels/{channel_id}/messages", json={"embeds": [embed]})]
+    if on_complete:
+        steps.append(on_complete(channel_id))
+    for result in await asyncio.gather(*steps, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error(f"Error completing order for ticket {channel_id}: {result}")
+    await send_interaction_followup(interaction_data, "✅ Order marked as completed!")
+    
+    # Close after delay
+    await asyncio.sleep(5)
+    await close_ticket_channel(channel_id, username)
+
+
+async def handle_interaction(
+    interaction_data: dict,
+    on_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+    booster_index=None
+) -> dict:
     """
     Handle Discord interaction (slash command)
     Returns the response to send back to Discord
+    /close and /complete are acknowledged with a deferred response straight away
+    and finished in the background; on_complete(channel_id) updates the order
+    When a BoosterIndex is given, the invoking member refreshes it and it backs
+    the booster role check
     """
     config = get_config()
     interaction_type = interaction_data.get("type")
@@ -514,8 +583,12 @@ async def handle_interaction(interaction_data: dict) -> dict:
         
         # Check if user has booster role OR admin permissions
         # Admin permission bit = 0x8 (ADMINISTRATOR)
-        booster_role_ids = [r.strip() for r in config['booster_role_ids'] if r.strip()]
-        has_booster_role = any(role in member_roles for role in booster_role_ids)
+        if booster_index is not None:
+            booster_index.apply_member(member)
+            has_booster_role = booster_index.has_booster_role(member_roles)
+        else:
+            booster_role_ids = [r.strip() for r in config['booster_role_ids'] if r.strip()]
+            has_booster_role = any(role in member_roles for role in booster_role_ids)
         has_admin_perms = (member_permissions & 0x8) == 0x8
         
         has_permission = has_booster_role or has_admin_perms
@@ -529,59 +602,17 @@ async def handle_interaction(interaction_data: dict) -> dict:
                 }
             }
         
+        username = user.get("username", "Staff")
+        
         if command_name == "close":
-            # Close the ticket
-            username = user.get("username", "Staff")
-            success = await close_ticket_channel(channel_id, username)
-            
-            if success:
-                return {
-                    "type": 4,
-                    "data": {
-                        "content": "✅ Closing ticket...",
-                        "flags": 64
-                    }
-                }
-            else:
-                return {
-                    "type": 4,
-                    "data": {
-                        "content": "❌ Failed to close ticket. Please try again or delete manually.",
-                        "flags": 64
-                    }
-                }
+            spawn(_finish_close(interaction_data, channel_id, username), name=f"close-{channel_id}")
+            return DEFERRED_EPHEMERAL_RESPONSE
         
         elif command_name == "complete":
-            # Mark order as completed and close ticket
-            username = user.get("username", "Staff")
-            
-            # Send completion message first
-            async with httpx.AsyncClient() as client:
-                embed = {
-                    "title": "✅ Order Completed!",
-                    "description": f"Your order has been marked as **completed** by **{username}**.\n\nThank you for choosing The Rival Syndicate!\n\nThis ticket will close in 5 seconds...",
-                    "color": 65489,
-                    "footer": {"text": "The Rival Syndicate"},
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-                await client.post(
-                    f"{DISCORD_API}/channels/{channel_id}/messages",
-                    headers=get_headers(),
-                    json={"embeds": [embed]}
-                )
-            
-            # Close after delay
-            import asyncio
-            await asyncio.sleep(5)
-            await close_ticket_channel(channel_id, username)
-            
-            return {
-                "type": 4,
-                "data": {
-                    "content": "✅ Order marked as completed!",
-                    "flags": 64
-                }
-            }
+            spawn(
+                _finish_complete(interaction_data, channel_id, username, on_complete),
+                name=f"complete-{channel_id}"
+            )
+            return DEFERRED_EPHEMERAL_RESPONSE
     
     return {"type": 1}
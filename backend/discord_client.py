@@ -0,0 +1,201 @@
+"""
+Shared HTTP client for the Discord REST API
+One pooled, keep-alive connection set per process, opened on startup and closed on shutdown
+Every request is scheduled through the rate limiter in discord_ratelimit and guarded by
+a per-endpoint circuit breaker (circuit_breaker)
+"""
+import os
+import time
+import asyncio
+import logging
+import importlib.util
+from typing import Optional
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+from env import env_int, env_float, env_bool
+from discord_ratelimit import RateLimiter
+from metrics import observe_discord, discord_endpoint
+from circuit_breaker import CircuitBreakers, CircuitOpenError
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+DISCORD_API = "https://discord.com/api/v10"
+
+
+class DiscordClient:
+    """
+    Long-lived httpx client for discord.com
+    Auth headers are built once; connections are pooled and reused between calls
+    """
+
+    def __init__(
+        self,
+        bot_token: Optional[str],
+        base_url: str = DISCORD_API,
+        http2: bool = False,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        write_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+        max_retries: int = 3,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.bot_token = bot_token
+        self.base_url = base_url
+        self.headers = {
+            "Authorization": f"Bot {bot_token}",
+            "Content-Type": "application/json",
+            "User-Agent": "DiscordBot (https://therivalsyndicate.com, 1.0)"
+        }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout
+        )
+        # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("DISCORD_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.transport = transport
+        self.ratelimiter = RateLimiter(max_retries=max_retries)
+        self.breakers = CircuitBreakers(failure_threshold=breaker_failures, reset_timeout=breaker_reset)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "DiscordClient":
+        return cls(
+            bot_token=os.environ.get('DISCORD_BOT_TOKEN'),
+            base_url=os.environ.get('DISCORD_API_URL', DISCORD_API),
+            http2=env_bool('DISCORD_HTTP2'),
+            max_connections=env_int('DISCORD_HTTP_MAX_CONNECTIONS', 20),
+            max_keepalive_connections=env_int('DISCORD_HTTP_MAX_KEEPALIVE', 10),
+            keepalive_expiry=env_float('DISCORD_HTTP_KEEPALIVE_EXPIRY', 30.0),
+            connect_timeout=env_float('DISCORD_HTTP_CONNECT_TIMEOUT', 5.0),
+            read_timeout=env_float('DISCORD_HTTP_READ_TIMEOUT', 10.0),
+            write_timeout=env_float('DISCORD_HTTP_WRITE_TIMEOUT', 10.0),
+            pool_timeout=env_float('DISCORD_HTTP_POOL_TIMEOUT', 5.0),
+            max_retries=env_int('DISCORD_RATELIMIT_MAX_RETRIES', 3),
+            breaker_failures=env_int('DISCORD_BREAKER_FAILURES', 5),
+            breaker_reset=env_float('DISCORD_BREAKER_RESET', 30.0)
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.bot_token)
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self):
+        """Open the connection pool (called from the app startup hook)"""
+        if self.started:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=self.http2,
+            transport=self.transport
+        )
+        logger.info(f"Discord HTTP client started (http2={self.http2}, max_connections={self.limits.max_connections})")
+
+    async def aclose(self):
+        """Close pooled connections (called from the app shutdown hook)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, path: str, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        `deadline` bounds how long the caller waits in seconds, rate-limit waits and retries included
+        Raises CircuitOpenError without calling Discord while the endpoint's breaker is open
+        """
+        breaker = self.breakers.get(f"{method} {discord_endpoint(path)}")
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {breaker.name}")
+
+        # Scripts that never ran the startup hook still get a working client
+        if not self.started:
+            await self.start()
+
+        attempts = 0
+
+        async def attempt() -> httpx.Response:
+            # Each HTTP attempt runs in its own task and gives the breaker its verdict
+            # (transport error or 5xx = failure); one cut short by the deadline still
+            # completes, so a slow queue is never mistaken for a slow Discord
+            nonlocal attempts
+            attempts += 1
+            started = time.perf_counter()
+
+            def finished(task: asyncio.Task):
+                status = "error"
+                if task.cancelled():
+                    breaker.release()
+                elif task.exception() is not None:
+                    breaker.record_failure()
+                else:
+                    status = str(task.result().status_code)
+                    if task.result().status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                # Timed per attempt, so rate-limit waits and retries are not counted as Discord latency
+                observe_discord(method, path, status, time.perf_counter() - started)
+
+            task = asyncio.ensure_future(self._client.request(method, path, **kwargs))
+            task.add_done_callback(finished)
+            return await asyncio.shield(task)
+
+        try:
+            sending = self.ratelimiter.send(method, path, attempt)
+            return await (asyncio.wait_for(sending, deadline) if deadline else sending)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Gave up while still queued on the rate limiter: Discord was never asked
+            if not attempts:
+                breaker.release()
+            raise
+
+    def stats(self) -> dict:
+        """Rate-limit queue depth and wait time, and circuit breaker states, for monitoring"""
+        return {**self.ratelimiter.stats(), "breakers": self.breakers.stats()}
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", path, **kwargs)
+
+
+# Process-wide client shared by every Discord call
+discord_client = DiscordClient.from_env()
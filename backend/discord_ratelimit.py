@@ -0,0 +1,260 @@
+"""
+Rate-limit scheduler for the Discord REST API
+Tracks per-route buckets and the global limit from X-RateLimit-* headers,
+queues requests per bucket and retries 429s after retry_after
+"""
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Optional, Dict, Callable, Awaitable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Path segments whose following id is a "major parameter" (own bucket per value)
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+
+def token_digest(token: str) -> str:
+    """Stand-in for a webhook/interaction token in keys and stats (tokens are secrets)"""
+    return "t" + hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+def route_key(method: str, path: str, keep_major: bool = True) -> str:
+    """
+    Build the rate-limit route for a request, e.g.
+    GET /channels/123/messages/456 -> "GET /channels/123/messages/:id"
+    Webhook tokens are replaced by their digest; keep_major=False replaces the
+    major parameters too (the route Discord's bucket hashes are shared across)
+    """
+    path = path.split("?", 1)[0]
+    parts = path.strip("/").split("/")
+    route = []
+    for i, part in enumerate(parts):
+        if i >= 2 and parts[i - 2] == "webhooks":
+            route.append(token_digest(part) if keep_major else ":token")
+        elif i >= 1 and parts[i - 1] in MAJOR_PARAMETERS and keep_major:
+            route.append(part)
+        elif part.isdigit():
+            route.append(":id")
+        else:
+            route.append(part)
+    return f"{method.upper()} /{'/'.join(route)}"
+
+
+def major_parameters(path: str) -> str:
+    """Return the major parameter values of a path, e.g. "channels/123" """
+    parts = path.split("?", 1)[0].strip("/").split("/")
+    for i, part in enumerate(parts[:-1]):
+        if part == "webhooks" and i + 2 < len(parts):
+            # Webhooks are keyed by id and token
+            return f"{part}/{parts[i + 1]}/{token_digest(parts[i + 2])}"
+        if part in MAJOR_PARAMETERS:
+            return f"{part}/{parts[i + 1]}"
+    return ""
+
+
+class RateLimitBucket:
+    """State and queue for one Discord rate-limit bucket"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock = asyncio.Lock()
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at = 0.0
+        # Longest Reset-After seen, i.e. roughly the window length
+        self.window = 0.0
+        # One request has run with the lock held to learn the limits; if its response had
+        # no X-RateLimit-* headers the route is treated as unlimited until headers appear
+        self.probed = False
+        self.queued = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+
+    def update(self, headers: httpx.Headers, now: float):
+        remaining = headers.get("X-RateLimit-Remaining")
+        limit = headers.get("X-RateLimit-Limit")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if limit is not None:
+            self.limit = int(limit)
+        if reset_after is not None:
+            self.reset_at = now + float(reset_after)
+            self.window = max(self.window, float(reset_after))
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queued,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "total_wait": round(self.total_wait, 3),
+            "remaining": self.remaining,
+            "limit": self.limit
+        }
+
+
+class RateLimiter:
+    """
+    Schedules Discord requests so that bucket and global limits are respected
+    Requests in the same bucket wait in FIFO order once the bucket is exhausted
+    Idle buckets (window over, nobody queued) are dropped every prune_interval seconds,
+    so per-channel and per-interaction buckets do not accumulate
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        max_retry_after: float = 60.0,
+        prune_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.prune_interval = prune_interval
+        self.clock = clock
+        # Route without major parameters ("GET /channels/:id/messages") -> bucket hash
+        # from X-RateLimit-Bucket; Discord shares one hash across channels, guilds, ...
+        self.route_buckets: Dict[str, str] = {}
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.pruned_at = clock()
+        self.global_reset_at = 0.0
+        self.global_rate_limited = 0
+        self.total_wait = 0.0
+
+    def _bucket_for(self, method: str, path: str) -> RateLimitBucket:
+        bucket_hash = self.route_buckets.get(route_key(method, path, keep_major=False))
+        key = f"{bucket_hash}:{major_parameters(path)}" if bucket_hash else route_key(method, path)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = RateLimitBucket(key)
+        return bucket
+
+    def _prune(self, now: float):
+        """Forget buckets whose window has passed and that nobody waits on or holds"""
+        if now - self.pruned_at < self.prune_interval:
+            return
+        self.pruned_at = now
+        idle = [
+            key for key, bucket in self.buckets.items()
+            if bucket.queued == 0 and not bucket.lock.locked() and bucket.reset_at <= now
+        ]
+        for key in idle:
+            del self.buckets[key]
+
+    async def _sleep(self, delay: float, bucket: RateLimitBucket):
+        if delay <= 0:
+            return
+        bucket.total_wait += delay
+        self.total_wait += delay
+        await asyncio.sleep(delay)
+
+    async def _acquire(self, bucket: RateLimitBucket) -> bool:
+        """
+        Wait until the bucket has room for one more request
+        Returns True when the bucket's limits are still unknown; the caller then
+        keeps the lock until the response headers have been read
+        """
+        bucket.queued += 1
+        try:
+            await bucket.lock.acquire()
+        finally:
+            bucket.queued -= 1
+        try:
+            # Global limit applies to every bucket
+            await self._sleep(self.global_reset_at - self.clock(), bucket)
+            if bucket.remaining == 0:
+                await self._sleep(bucket.reset_at - self.clock(), bucket)
+                bucket.remaining = bucket.limit
+                # The new window's reset is only known once one of its responses is back;
+                # until then assume a full window, so a later waiter cannot refill it again
+                bucket.reset_at = self.clock() + bucket.window
+            if bucket.remaining is not None:
+                bucket.remaining -= 1
+        except BaseException:
+            bucket.lock.release()
+            raise
+        bucket.requests += 1
+        if bucket.limit is None and not bucket.probed:
+            bucket.probed = True
+            return True
+        bucket.lock.release()
+        return False
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        retry_after = None
+        try:
+            retry_after = response.json().get("retry_after")
+        except Exception:
+            pass
+        if retry_after is None:
+            retry_after = response.headers.get("Retry-After", 1)
+        return min(float(retry_after), self.max_retry_after)
+
+    def _is_global(self, response: httpx.Response) -> bool:
+        if response.headers.get("X-RateLimit-Global", "").lower() == "true":
+            return True
+        if response.headers.get("X-RateLimit-Scope") == "global":
+            return True
+        try:
+            return bool(response.json().get("global"))
+        except Exception:
+            return False
+
+    async def send(self, method: str, path: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run `send` once the bucket for (method, path) allows it
+        429 responses are retried up to max_retries times, then returned as-is
+        """
+        route = route_key(method, path)
+        shared_route = route_key(method, path, keep_major=False)
+        self._prune(self.clock())
+        for attempt in range(self.max_retries + 1):
+            acquired = self._bucket_for(method, path)
+            probing = await self._acquire(acquired)
+            try:
+                response = await send()
+                now = self.clock()
+
+                bucket_hash = response.headers.get("X-RateLimit-Bucket")
+                if bucket_hash and self.route_buckets.get(shared_route) != bucket_hash:
+                    self.route_buckets[shared_route] = bucket_hash
+                bucket = self._bucket_for(method, path)
+                bucket.update(response.headers, now)
+                if acquired is not bucket:
+                    # Requests already queued on the provisional route bucket
+                    acquired.update(response.headers, now)
+            finally:
+                if probing:
+                    acquired.lock.release()
+
+            if response.status_code != 429:
+                return response
+
+            retry_after = self._retry_after(response)
+            bucket.rate_limited += 1
+            if self._is_global(response):
+                self.global_rate_limited += 1
+                self.global_reset_at = max(self.global_reset_at, now + retry_after)
+                logger.warning(f"Discord global rate limit hit, retrying in {retry_after:.2f}s")
+            else:
+                bucket.remaining = 0
+                bucket.reset_at = max(bucket.reset_at, now + retry_after)
+                logger.warning(f"Discord rate limit hit on {route}, retrying in {retry_after:.2f}s")
+
+            if attempt == self.max_retries:
+                logger.error(f"Giving up on {route} after {attempt + 1} rate-limited attempts")
+                return response
+
+    def stats(self) -> Dict:
+        """Queue depth, wait time and 429 counts per bucket"""
+        return {
+            "queued": sum(b.queued for b in self.buckets.values()),
+            "total_wait": round(self.total_wait, 3),
+            "global_rate_limited": self.global_rate_limited,
+            "buckets": {key: bucket.stats() for key, bucket in self.buckets.items()}
+        }
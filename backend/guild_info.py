@@ -0,0 +1,58 @@
+"""
+Background copy of the Discord server info (GET /api/discord/info)
+Discord is read on an interval; requests are served from memory
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from background import Periodic
+from discord_bot import get_guild_info
+from last_good import LastKnownGood
+
+logger = logging.getLogger(__name__)
+
+FALLBACK = {"name": "The Rival Syndicate", "icon": None, "member_count": 0}
+
+
+class GuildInfoSnapshot(Periodic):
+    """
+    Holds the last guild info read from Discord
+    A failed refresh keeps the previous copy and flags it stale; with a `store`, each
+    refresh persists the copy and a new process that cannot reach Discord starts from it
+    """
+
+    def __init__(self, refresh_interval: float = 60.0, store: Optional[LastKnownGood] = None):
+        self.refresh_interval = refresh_interval
+        self.store = store
+        self.info: Optional[Dict] = None
+        self.updated_at: Optional[datetime] = None
+        self.stale = True
+        super().__init__(self.refresh, refresh_interval, name="guild-info")
+
+    async def refresh(self) -> bool:
+        """Read the guild info from Discord; returns True when it was refreshed"""
+        info = await get_guild_info()
+        if info:
+            self.info = info
+            self.updated_at = datetime.utcnow()
+            self.stale = False
+            if self.store:
+                await self.store.save(info)
+            return True
+
+        self.stale = True
+        if self.info is None and self.store:
+            stored = await self.store.load()
+            if stored:
+                self.info, self.updated_at = stored
+        logger.warning("Guild info refresh failed, keeping last good copy")
+        return False
+
+    def to_dict(self) -> Dict:
+        if self.info is None:
+            return {**FALLBACK, "stale": True}
+        response = {**self.info, "stale": self.stale}
+        if self.stale:
+            response["updated_at"] = self.updated_at.isoformat()
+        return response
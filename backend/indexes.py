@@ -0,0 +1,153 @@
+"""
+Index registry for the Mongo collections, ensured on startup
+Also verifies with `explain` that the query shapes used by the routes are index-backed:
+
+    python indexes.py ensure
+    python indexes.py verify      # exits 1 if any query shape falls back to COLLSCAN
+"""
+import sys
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Set
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# collection -> indexes; names are fixed so re-running is a no-op
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("discord_id", ASCENDING)], name="discord_id_unique", unique=True),
+        IndexModel([("role", ASCENDING)], name="role"),
+    ],
+    "orders": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Trailing id matches the keyset pagination order (created_at, id)
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="user_id_created_at_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at_id"),
+        IndexModel([("ticket_channel_id", ASCENDING)], name="ticket_channel_id"),
+        # Only orders still waiting on their ticket, for the outbox recovery pass
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="ticket_pending_created_at",
+            partialFilterExpression={"ticket_status": "pending"}
+        ),
+    ],
+    "ticket_outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        IndexModel([("order_id", ASCENDING)], name="order_id_unique", unique=True),
+    ],
+    "vouches": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("snowflake", DESCENDING)], name="snowflake"),
+    ],
+}
+
+# Query shapes issued by the routes, checked by `verify`
+_T = datetime(2024, 1, 1)
+# GET /admin/users lists every user and is deliberately left out
+QUERY_SHAPES: List[Dict] = [
+    {"name": "user by id", "collection": "users", "filter": {"id": "x"}},
+    {"name": "user by discord_id", "collection": "users", "filter": {"discord_id": "x"}},
+    {"name": "boosters", "collection": "users", "filter": {"role": {"$in": ["booster", "admin"]}}},
+    {"name": "order by id", "collection": "orders", "filter": {"id": "x"}},
+    {"name": "orders of user", "collection": "orders", "filter": {"user_id": "x"}, "sort": {"created_at": -1}},
+    {"name": "admin orders", "collection": "orders", "filter": {}, "sort": {"created_at": -1}},
+    {"name": "admin orders by status", "collection": "orders", "filter": {"status": "pending"}, "sort": {"created_at": -1}},
+    {"name": "orders of user after cursor", "collection": "orders", "filter": {"user_id": "x", "$or": [
+        {"created_at": {"$lt": _T}}, {"created_at": _T, "id": {"$lt": "x"}}
+    ]}, "sort": {"created_at": -1, "id": -1}, "limit": 51},
+    {"name": "admin orders after cursor", "collection": "orders", "filter": {"$or": [
+        {"created_at": {"$lt": _T}}, {"created_at": _T, "id": {"$lt": "x"}}
+    ]}, "sort": {"created_at": -1, "id": -1}, "limit": 51},
+    {"name": "admin orders by status after cursor", "collection": "orders", "filter": {"status": "pending", "$or": [
+        {"created_at": {"$lt": _T}}, {"created_at": _T, "id": {"$lt": "x"}}
+    ]}, "sort": {"created_at": -1, "id": -1}, "limit": 51},
+    {"name": "booster stats", "collection": "orders", "filter": {"booster_id": {"$ne": None}, "status": {"$in": ["completed", "in_progress"]}}},
+    {"name": "order by ticket channel", "collection": "orders", "filter": {"ticket_channel_id": "x", "status": {"$ne": "completed"}}},
+    {"name": "ticket outbox claim", "collection": "ticket_outbox", "filter": {"$or": [
+        {"status": "pending", "next_attempt_at": {"$lte": _T}},
+        {"status": "processing", "lease_until": {"$lte": _T}}
+    ]}},
+    {"name": "orders without ticket", "collection": "orders", "filter": {"ticket_status": "pending", "created_at": {"$lte": _T}}},
+    {"name": "ticket jobs of orders", "collection": "ticket_outbox", "filter": {"order_id": {"$in": ["x"]}}},
+    {"name": "latest vouches", "collection": "vouches", "filter": {}, "sort": {"snowflake": -1}, "limit": 50},
+]
+
+
+async def ensure_indexes(db) -> bool:
+    """Create every registered index; returns False if any of them could not be created"""
+    ok = True
+    for collection, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicate values blocking a unique index, or a conflicting existing index
+                name = model.document["name"]
+                logger.error(f"Failed to create index {collection}.{name}: {e}")
+                ok = False
+    return ok
+
+
+def plan_stages(plan: Dict) -> Set[str]:
+    """All stage names in an explain plan tree"""
+    stages = set()
+    if "stage" in plan:
+        stages.add(plan["stage"])
+    for key in ("inputStage", "queryPlan", "winningPlan"):
+        if isinstance(plan.get(key), dict):
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+
+async def verify_query_plans(db) -> List[str]:
+    """Explain each query shape; returns the names of shapes that scan a whole collection"""
+    failures = []
+    for shape in QUERY_SHAPES:
+        find = {"find": shape["collection"], "filter": shape["filter"]}
+        if "sort" in shape:
+            find["sort"] = shape["sort"]
+        if "limit" in shape:
+            find["limit"] = shape["limit"]
+        explain = await db.command("explain", find, verbosity="queryPlanner")
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        if "COLLSCAN" in stages:
+            failures.append(shape["name"])
+            logger.error(f"COLLSCAN: {shape['name']} on {shape['collection']}")
+        else:
+            logger.info(f"ok: {shape['name']} ({', '.join(sorted(stages))})")
+    return failures
+
+
+async def _main(command: str) -> int:
+    import os
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        ok = await ensure_indexes(db)
+        if command == "verify":
+            ok = not await verify_query_plans(db) and ok
+        return 0 if ok else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command not in ("ensure", "verify"):
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(command)))
@@ -0,0 +1,60 @@
+"""
+Signature check for Discord interaction webhooks (POST /api/discord/interactions)
+The public key is parsed once; requests with a stale timestamp or a malformed
+signature are turned away before any Ed25519 work
+"""
+import time
+import logging
+from typing import Callable
+
+from nacl.signing import VerifyKey
+from nacl.exceptions import BadSignatureError
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionVerifier:
+    """
+    Discord signs timestamp + raw body; the timestamp is unix seconds
+    Without a public key every request passes (local testing), as before
+    """
+
+    def __init__(self, public_key_hex: str, max_age: float = 300.0, clock: Callable[[], float] = time.time):
+        self.max_age = max_age
+        self.clock = clock
+        self.enabled = bool(public_key_hex)
+        self.verify_key = None
+        if self.enabled:
+            try:
+                self.verify_key = VerifyKey(bytes.fromhex(public_key_hex))
+            except Exception as e:
+                # Leave verify_key unset: every request is rejected rather than let through
+                logger.error(f"Invalid DISCORD_PUBLIC_KEY: {e}")
+        else:
+            logger.warning("DISCORD_PUBLIC_KEY not set, skipping verification")
+
+    def verify(self, signature: str, timestamp: str, body: bytes) -> bool:
+        if not self.enabled:
+            return True
+        if self.verify_key is None:
+            return False
+
+        try:
+            sent_at = int(timestamp)
+        except ValueError:
+            return False
+        if abs(self.clock() - sent_at) > self.max_age:
+            logger.debug("Rejected Discord interaction with stale timestamp")
+            return False
+        if len(signature) != 128:
+            return False
+
+        try:
+            self.verify_key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+            return True
+        except BadSignatureError:
+            logger.error("Invalid Discord signature")
+            return False
+        except Exception as e:
+            logger.error(f"Signature verification error: {e}")
+            return False
@@ -0,0 +1,48 @@
+"""
+Last successful value of a Discord-backed response, kept in memory and in Mongo
+(`last_good`, one document per key) so a fresh process can serve it while Discord is down
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Standard HTTP flag for a response served from a stale copy
+STALE_HEADERS = {"Warning": '110 - "Response is Stale"'}
+
+
+class LastKnownGood:
+    def __init__(self, db, key: str):
+        self.collection = db.last_good
+        self.key = key
+        self.value: Optional[Dict] = None
+        self.saved_at: Optional[datetime] = None
+
+    async def save(self, value: Dict):
+        """Remember `value`; Mongo is only written when it changed"""
+        if value == self.value:
+            return
+        self.value = value
+        self.saved_at = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": self.key},
+                {"$set": {"value": value, "saved_at": self.saved_at}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist last good {self.key}: {e}")
+
+    async def load(self) -> Optional[Tuple[Dict, datetime]]:
+        """(value, saved_at) from memory, else from Mongo; None if nothing was ever saved"""
+        if self.value is None:
+            try:
+                doc = await self.collection.find_one({"_id": self.key})
+            except Exception as e:
+                logger.error(f"Failed to load last good {self.key}: {e}")
+                return None
+            if not doc:
+                return None
+            self.value, self.saved_at = doc["value"], doc["saved_at"]
+        return self.value, self.saved_at
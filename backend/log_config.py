@@ -0,0 +1,101 @@
+"""
+Process logging setup
+Handlers only put records on a queue; a QueueListener thread formats and writes them,
+so log I/O stays out of request latency. Records are JSON lines unless LOG_FORMAT=text
+"""
+import os
+import copy
+import queue
+import atexit
+import random
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Third-party loggers kept at WARNING whatever LOG_LEVEL says
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+# LogRecord attributes; anything else on a record came from `extra=` and is kept as a field
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare flattens the record into a preformatted string;
+    this keeps the fields and only resolves what cannot cross threads (args, exc_info)
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SampleFilter(logging.Filter):
+    """Keep a fraction of records (0..1); WARNING records that repeat per request can flood the logs"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def stop_listener(listener: QueueListener):
+    """Flush queued records and stop the writer thread (safe to call twice)"""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def setup_logging(level: str = None, fmt: str = None, stream=None) -> QueueListener:
+    """Route the root logger through a queue; the listener is stopped (and flushed) at exit"""
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.environ.get('LOG_FORMAT', 'json')).lower()
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(TEXT_FORMAT) if fmt == "text" else JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(StructuredQueueHandler(log_queue))
+    root.setLevel(level)
+    # httpx logs every request URL at INFO; interaction webhook URLs carry live tokens
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    listener.start()
+    atexit.register(stop_listener, listener)
+    return listener
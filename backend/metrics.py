@@ -0,0 +1,226 @@
+"""
+In-process metrics rendered in the Prometheus text format (GET /api/metrics)
+  - HTTP: per-route latency histogram and status counts (ASGI middleware); event streams
+    are only counted, their duration is the life of the connection
+  - Mongo: per collection/command latency and failures (pymongo CommandListener)
+  - Discord: per-endpoint latency, status codes and 429s (DiscordClient)
+Metrics are per process; scrape each worker. See benchmarks/bench_metrics.py for the overhead
+"""
+import re
+import time
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        # Mongo listeners run on driver threads
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, value: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+        # Callables returning extra exposition lines (gauges read from other components)
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP responses by route and status", ("method", "route", "status")
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "Mongo command latency", ("collection", "command")
+))
+mongo_command_failures = registry.register(Counter(
+    "mongo_command_failures_total", "Failed Mongo commands", ("collection", "command")
+))
+discord_request_duration = registry.register(Histogram(
+    "discord_request_duration_seconds", "Discord API call latency (each attempt)", ("method", "endpoint")
+))
+discord_responses = registry.register(Counter(
+    "discord_responses_total", "Discord API responses by status (error = no response)", ("method", "endpoint", "status")
+))
+discord_rate_limited = registry.register(Counter(
+    "discord_rate_limited_total", "Discord 429 responses", ("method", "endpoint")
+))
+
+
+def gauge(name: str, help: str, values: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """Exposition lines for a gauge computed at scrape time; keys are ((label, value), ...)"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in values.items():
+        names = tuple(label for label, _ in labels)
+        lines.append(f"{name}{_labels(names, tuple(v for _, v in labels))} {value}")
+    return lines
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream wrapping)
+    Routes are labelled by their template, e.g. /api/orders/{order_id}
+    Server-Sent Events responses stay out of the latency histogram
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_with_status(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            if not streaming:
+                http_request_duration.observe(time.perf_counter() - started, method, path)
+            http_requests.inc(method, path, str(status))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Pass to AsyncIOMotorClient(event_listeners=[...]); callbacks run on driver threads"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple, str] = {}
+
+    def started(self, event):
+        command = event.command
+        target = command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = command.get("collection")
+        self._pending[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+_SNOWFLAKE = re.compile(r"^\d{5,}$")
+
+
+@lru_cache(maxsize=1024)
+def discord_endpoint(path: str) -> str:
+    """Path template for labels: ids become :id, webhook tokens :token (never exported)"""
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    labelled = []
+    for i, segment in enumerate(segments):
+        if i >= 2 and segments[i - 2] == "webhooks":
+            labelled.append(":token")
+        elif _SNOWFLAKE.match(segment):
+            labelled.append(":id")
+        else:
+            labelled.append(segment)
+    return "/" + "/".join(labelled)
+
+
+def observe_discord(method: str, path: str, status: str, seconds: float):
+    endpoint = discord_endpoint(path)
+    discord_request_duration.observe(seconds, method, endpoint)
+    discord_responses.inc(method, endpoint, status)
+    if status == "429":
+        discord_rate_limited.inc(method, endpoint)
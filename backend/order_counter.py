@@ -0,0 +1,62 @@
+"""
+Completed-orders counter kept in Mongo (collection `counters`)
+Incremented when an order moves to completed, so reading it is a single lookup
+"""
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_ORDERS = "orders_completed"
+
+
+class CompletedOrdersCounter:
+    """
+    Counter document: {_id: "orders_completed", value, seeded_at}
+    Increments made before the one-off backfill are kept; the backfill adds to them
+    """
+
+    def __init__(self, db):
+        self.counters = db.counters
+
+    async def get(self) -> int:
+        doc = await self.counters.find_one({"_id": COMPLETED_ORDERS})
+        return doc.get("value", 0) if doc else 0
+
+    async def increment(self, by: int = 1):
+        await self.counters.update_one(
+            {"_id": COMPLETED_ORDERS},
+            {"$inc": {"value": by}},
+            upsert=True
+        )
+
+    async def seed(self, backfill: Callable[[], Awaitable[Optional[int]]]) -> bool:
+        """
+        Add the historic count from `backfill` once (e.g. a full orders channel count)
+        Returns True when this call seeded the counter
+        """
+        doc = await self.counters.find_one({"_id": COMPLETED_ORDERS})
+        if doc and doc.get("seeded_at"):
+            return False
+
+        count = await backfill()
+        if count is None:
+            logger.warning("Completed orders backfill failed, counter not seeded")
+            return False
+
+        try:
+            result = await self.counters.update_one(
+                {"_id": COMPLETED_ORDERS, "seeded_at": {"$exists": False}},
+                {"$inc": {"value": count}, "$set": {"seeded_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker seeded it first
+            return False
+        seeded = result.modified_count > 0 or result.upserted_id is not None
+        if seeded:
+            logger.info(f"Seeded completed orders counter with {count} from backfill")
+        return seeded
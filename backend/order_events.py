@@ -0,0 +1,145 @@
+"""
+In-process pub/sub of order changes, streamed to customers as Server-Sent Events
+Handlers publish the updated order; each subscriber only receives its own user's orders.
+With change streams enabled (replica set required) events come from Mongo instead,
+so every worker sees changes made by the others
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+from background import spawn
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEvents:
+    """
+    Event ids are "<epoch>-<seq>"; the epoch changes per process, so a Last-Event-ID
+    from another worker (or one older than the replay buffer) gets a `reset` event
+    telling the client to re-fetch its orders
+    """
+
+    def __init__(
+        self,
+        db=None,
+        change_streams: bool = False,
+        buffer_size: int = 1000,
+        queue_size: int = 100,
+        heartbeat_interval: float = 15.0
+    ):
+        self.orders = db.orders if db is not None else None
+        self.change_streams = change_streams
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._seq = 0
+        self._buffer: Deque[Tuple[int, str, bytes]] = deque(maxlen=buffer_size)
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task = None
+
+    async def start(self):
+        if self.change_streams and self.orders is not None:
+            self._task = spawn(self._watch(), name="order-change-stream")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # End open streams so shutdown does not wait on them
+        for queues in self._subscribers.values():
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def publish(self, order: Dict):
+        """Called by the handlers after an order changed (no-op when change streams feed events)"""
+        if not self.change_streams:
+            self._dispatch(order)
+
+    def _dispatch(self, order: Dict):
+        user_id = order.get("user_id")
+        if not user_id:
+            return
+        self._seq += 1
+        data = dumps({k: v for k, v in order.items() if k != "_id"})
+        self._buffer.append((self._seq, user_id, data))
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait((self._seq, data))
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream, it resumes from its last event id
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _watch(self):
+        resume_token = None
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        while True:
+            try:
+                async with self.orders.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    logger.info("Watching order change stream")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        if change.get("fullDocument"):
+                            self._dispatch(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Order change stream failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+    def _parse_event_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to resume after, or None when this process cannot replay from it"""
+        epoch, _, seq = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+        # Events after seq must all still be buffered
+        return seq if seq + 1 >= oldest else None
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def stream(self, user_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """SSE frames for `user_id`: replay after last_event_id, then live events and heartbeats"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield "retry: 3000\n\n"
+            # Live events up to here are also in the buffer; don't send them twice
+            replayed = 0
+            if last_event_id:
+                after = self._parse_event_id(last_event_id)
+                if after is None:
+                    yield f"id: {self.epoch}-{self._seq}\nevent: reset\ndata: {{}}\n\n"
+                else:
+                    replayed = self._seq
+                    for seq, owner, data in list(self._buffer):
+                        if seq > after and owner == user_id:
+                            yield self._frame(seq, data)
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                if item[0] > replayed:
+                    yield self._frame(*item)
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def _frame(self, seq: int, data: bytes) -> str:
+        return f"id: {self.epoch}-{seq}\nevent: order\ndata: {data.decode()}\n\n"
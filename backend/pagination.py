@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) pagination over orders sorted newest first by (created_at, id)
+The cursor is the sort key of the last order on a page, encoded as an opaque string
+"""
+import json
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+ORDER_SORT = [("created_at", -1), ("id", -1)]
+
+
+def encode_cursor(doc: Dict) -> str:
+    key = [doc["created_at"].isoformat(), doc["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises a 400 for anything that is not a cursor returned by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(order_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(query: Dict, cursor: Optional[str]) -> Dict:
+    """Restrict `query` to orders sorting after the cursor; an empty cursor is the first page"""
+    if not cursor:
+        return query
+    created_at, order_id = decode_cursor(cursor)
+    keyset = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": order_id}}
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+async def fetch_page(
+    collection,
+    query: Dict,
+    cursor: Optional[str],
+    limit: int,
+    projection: Optional[Dict] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """One page of orders and the cursor of the next page (None on the last page)"""
+    docs = await collection.find(after_cursor(query, cursor), projection).sort(ORDER_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
@@ -0,0 +1,89 @@
+"""
+Catalog price matrix: every character x service type, in every currency
+USD prices are base price + service priceModifier; converted tables are computed in one
+vectorized pass per exchange-rate refresh and rounded the way the frontend displays them
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import Request, Response
+
+from static_payload import StaticPayload
+
+logger = logging.getLogger(__name__)
+
+# Shown without decimals (matches ServicesPage convertPrice)
+ZERO_DECIMAL_CURRENCIES = {"JPY", "KRW", "INR", "PHP"}
+
+# Submitted USD prices may differ from the table by float noise only
+PRICE_TOLERANCE = 0.005
+
+
+class PriceMatrix:
+    """
+    usd_price() is a dict lookup by (character_id, service_type)
+    Per-currency responses are built on first request and kept until the rates change
+    """
+
+    def __init__(self, characters: Dict[str, List[Dict]], service_types: List[Dict], currency_rates, max_age: int = 300):
+        self.currency_rates = currency_rates
+        self.max_age = max_age
+        self.character_ids = [c["id"] for group in characters.values() for c in group]
+        self.service_ids = [s["id"] for s in service_types]
+        base = np.array([c["basePrice"] for group in characters.values() for c in group], dtype=np.float64)
+        modifiers = np.array([s["priceModifier"] for s in service_types], dtype=np.float64)
+        # (characters, services)
+        self.usd = base[:, None] + modifiers[None, :]
+        self._usd_index: Dict[Tuple[str, str], float] = {
+            (character_id, service_id): float(self.usd[i, j])
+            for i, character_id in enumerate(self.character_ids)
+            for j, service_id in enumerate(self.service_ids)
+        }
+        self._rates_version = None
+        self._currencies: Dict[str, int] = {}
+        self._rates = np.ones(0)
+        self._table = np.zeros((0,) + self.usd.shape)
+        self._payloads: Dict[str, StaticPayload] = {}
+
+    def usd_price(self, character_id: str, service_type: str) -> Optional[float]:
+        return self._usd_index.get((character_id, service_type))
+
+    def _rebuild(self):
+        """Convert the USD matrix into every currency at once: (currencies, characters, services)"""
+        rates = self.currency_rates.rates
+        codes = sorted(code for code, rate in rates.items() if isinstance(rate, (int, float)) and rate > 0)
+        self._currencies = {code: i for i, code in enumerate(codes)}
+        self._rates = np.array([rates[code] for code in codes], dtype=np.float64)
+        scale = np.array([1 if code in ZERO_DECIMAL_CURRENCIES else 100 for code in codes], dtype=np.float64)
+        scaled = self.usd[None, :, :] * (self._rates * scale)[:, None, None]
+        # Round half up like Math.round, not numpy's round-half-to-even
+        self._table = np.floor(scaled + 0.5) / scale[:, None, None]
+        self._payloads = {}
+        self._rates_version = self.currency_rates.version
+
+    def _payload(self, currency: str) -> Optional[StaticPayload]:
+        if self._rates_version != self.currency_rates.version:
+            self._rebuild()
+        payload = self._payloads.get(currency)
+        if payload is None:
+            index = self._currencies.get(currency)
+            if index is None:
+                return None
+            table = self._table[index].tolist()
+            payload = StaticPayload({
+                "currency": currency,
+                "rate": float(self._rates[index]),
+                "updated": self.currency_rates.updated,
+                "prices": {
+                    character_id: dict(zip(self.service_ids, row))
+                    for character_id, row in zip(self.character_ids, table)
+                }
+            }, max_age=self.max_age)
+            self._payloads[currency] = payload
+        return payload
+
+    def response(self, currency: str, request: Request) -> Optional[Response]:
+        """None when there is no rate for `currency`"""
+        payload = self._payload(currency.upper())
+        return payload.response(request) if payload else None
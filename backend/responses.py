@@ -0,0 +1,36 @@
+"""
+Fast JSON responses for endpoints returning Mongo documents
+Endpoints return MongoJSONResponse directly, which skips FastAPI's jsonable_encoder pass
+"""
+from typing import Any, Dict, Iterable
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Datetimes keep the format FastAPI produced (ISO 8601, naive stays naive),
+    enums serialize to their value and ObjectIds to their hex string
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MongoJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def projection(fields: Iterable[str]) -> Dict[str, int]:
+    """Inclusion projection for `fields`, without Mongo's _id"""
+    return {"_id": 0, **{field: 1 for field in fields}}
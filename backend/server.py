@@ -1,10 +1,13 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Query, Header
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
 import os
+import hmac
 import logging
+import asyncio
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -15,16 +18,109 @@ from jose import JWTError, jwt
 from enum import Enum
 
 # Import Discord bot service
-from discord_bot import create_ticket_channel, fetch_vouches, send_ticket_update, get_guild_info, get_orders_count, get_active_boosters_count, close_ticket_channel, register_slash_commands, handle_interaction
+from discord_bot import get_config, send_ticket_update, get_orders_count, close_ticket_channel, handle_interaction
+from discord_client import discord_client
+from ticket_outbox import TicketOutbox, TICKET_PENDING
+from vouch_store import VouchStore
+from stats_snapshot import StatsSnapshot
+from guild_info import GuildInfoSnapshot
+from booster_index import BoosterIndex
+from order_counter import CompletedOrdersCounter
+from user_cache import UserCache
+from indexes import ensure_indexes
+from pagination import fetch_page
+from responses import MongoJSONResponse, projection
+from static_payload import StaticPayload
+from order_events import OrderEvents
+from currency_rates import CurrencyRates
+from pricing import PriceMatrix, PRICE_TOLERANCE
+from command_sync import CommandSync
+from booster_stats import BoosterStats, EMPTY as NO_BOOSTER_STATS
+from metrics import registry as metrics_registry, gauge, MetricsMiddleware, MongoCommandMetrics
+from log_config import setup_logging, SampleFilter
+from last_good import LastKnownGood, STALE_HEADERS
+from env import env_bool
+import background
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Per collection/command timings for /api/metrics
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ['DB_NAME']]
 
+# Discord ticket channels are created by a background worker
+ticket_outbox = TicketOutbox(
+    db,
+    workers=int(os.environ.get('TICKET_OUTBOX_WORKERS', 1)),
+    max_attempts=int(os.environ.get('TICKET_OUTBOX_MAX_ATTEMPTS', 6))
+)
+
+# Vouches are synced from Discord in the background and served from Mongo
+vouch_store = VouchStore(db, sync_interval=float(os.environ.get('VOUCHES_SYNC_INTERVAL', 60)))
+
+# Members holding a booster role, kept current by periodic member sweeps
+booster_index = BoosterIndex(
+    get_config()['booster_role_ids'],
+    sweep_interval=float(os.environ.get('BOOSTER_SWEEP_INTERVAL', 900))
+)
+
+# User documents looked up by get_current_user
+user_cache = UserCache(
+    lambda user_id: db.users.find_one({"id": user_id}),
+    max_size=int(os.environ.get('USER_CACHE_SIZE', 1000)),
+    ttl=float(os.environ.get('USER_CACHE_TTL', 30))
+)
+
+# Order changes pushed to customers over SSE (GET /api/orders/stream)
+order_events = OrderEvents(
+    db,
+    change_streams=env_bool('ORDER_EVENTS_CHANGE_STREAMS'),
+    heartbeat_interval=float(os.environ.get('ORDER_EVENTS_HEARTBEAT', 15))
+)
+
+# USD exchange rates, refreshed ahead of expiry and persisted for new workers
+currency_rates = CurrencyRates(
+    db,
+    ttl=float(os.environ.get('CURRENCY_RATES_TTL', 3600)),
+    max_age=int(os.environ.get('CURRENCY_RATES_MAX_AGE', 300))
+)
+
+# Slash commands are registered in the background, only when they changed
+command_sync = CommandSync(db)
+
+# Discord status posts sent at once after a bulk order update
+BULK_NOTIFY_CONCURRENCY = int(os.environ.get('BULK_NOTIFY_CONCURRENCY', 5))
+
+# Per-booster order counts and revenue for the admin dashboard
+booster_stats = BoosterStats(
+    db,
+    materialized=env_bool('BOOSTER_STATS_MATERIALIZED'),
+    refresh_interval=float(os.environ.get('BOOSTER_STATS_REFRESH_INTERVAL', 300))
+)
+
+# Completed orders are counted in Mongo as orders move to completed
+completed_orders = CompletedOrdersCounter(db)
+
+# Discord server info, refreshed in the background; served flagged as stale when
+# Discord cannot be reached (or its circuit is open)
+guild_info = GuildInfoSnapshot(
+    refresh_interval=float(os.environ.get('DISCORD_INFO_REFRESH_INTERVAL', 60)),
+    store=LastKnownGood(db, "discord_info")
+)
+
+# Public stats are recomputed in the background and served from memory;
+# the member count comes from the guild info copy above
+stats_snapshot = StatsSnapshot(
+    booster_index,
+    completed_orders,
+    guild_info,
+    refresh_interval=float(os.environ.get('STATS_REFRESH_INTERVAL', 60)),
+    store=LastKnownGood(db, "stats")
+)
+
 # Discord OAuth Config
 DISCORD_CLIENT_ID = os.environ.get('DISCORD_CLIENT_ID')
 DISCORD_CLIENT_SECRET = os.environ.get('DISCORD_CLIENT_SECRET')
@@ -32,6 +128,9 @@ DISCORD_REDIRECT_URI = os.environ.get('DISCORD_REDIRECT_URI')
 JWT_SECRET = os.environ.get('JWT_SECRET', 'default_secret_key')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
+# Tokens for GET /api/orders/stream?token= only; the URL ends up in access logs
+STREAM_TOKEN_TYPE = "stream"
+STREAM_TOKEN_SECONDS = int(os.environ.get('STREAM_TOKEN_SECONDS', 60))
 
 DISCORD_API_ENDPOINT = "https://discord.com/api/v10"
 # URL encode the redirect URI for the OAuth URL
@@ -49,13 +148,14 @@ app.mount("/api/static", StaticFiles(directory="static"), name="static")
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queued JSON records, see log_config)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Per-request auth failures are sampled; successes are only logged at DEBUG
+auth_logger = logging.getLogger("auth")
+auth_logger.addFilter(SampleFilter(float(os.environ.get('AUTH_LOG_SAMPLE_RATE', 0.1))))
+
 # Enums
 class UserRole(str, Enum):
     client = "client"
@@ -117,6 +217,14 @@ class OrderUpdate(BaseModel):
     notes: Optional[str] = None
     booster_id: Optional[str] = None
     eta: Optional[str] = None
+    # Version the client last read; when given, the update fails with 409 if the order changed since
+    version: Optional[int] = None
+
+class OrderBulkUpdate(OrderUpdate):
+    id: str
+
+class OrderBulkRequest(BaseModel):
+    updates: List[OrderBulkUpdate] = Field(..., min_length=1, max_length=100)
 
 class Order(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -135,9 +243,18 @@ class Order(BaseModel):
     payment_method: str
     notes: str = ""
     eta: str = "TBD"
+    ticket_status: str = TICKET_PENDING
+    ticket_channel_id: Optional[str] = None
+    ticket_channel_name: Optional[str] = None
+    # Incremented on every PATCH for optimistic concurrency
+    version: int = 1
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Only the fields the API returns are read from Mongo
+ORDER_PROJECTION = projection(Order.model_fields)
+USER_PROJECTION = projection(UserResponse.model_fields)
+
 # JWT Token Functions
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -146,6 +263,11 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
+def create_stream_token(user_id: str):
+    """Short-lived token that can only open the order stream"""
+    expire = datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_SECONDS)
+    return jwt.encode({"user_id": user_id, "type": STREAM_TOKEN_TYPE, "exp": expire}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
 def decode_access_token(token: str):
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
@@ -156,7 +278,7 @@ def decode_access_token(token: str):
 # Dependency to get current user
 async def get_current_user(authorization: Optional[str] = Header(None)):
     if not authorization:
-        logger.warning("No authorization header provided")
+        auth_logger.warning("No authorization header provided")
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
@@ -166,24 +288,26 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
         else:
             token = authorization
         
-        logger.info(f"Attempting to decode token: {token[:20]}...")
+        # Never log the token itself, not even a prefix
         payload = decode_access_token(token)
         if payload is None:
-            logger.warning("Token decode returned None")
+            auth_logger.warning("Invalid or expired token")
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if payload.get("type") == STREAM_TOKEN_TYPE:
+            auth_logger.warning("Stream token used as a session token")
             raise HTTPException(status_code=401, detail="Invalid token")
         
         user_id = payload.get("user_id")
         if user_id is None:
-            logger.warning("No user_id in token payload")
+            auth_logger.warning("No user_id in token payload")
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        logger.info(f"Looking up user with id: {user_id}")
-        user = await db.users.find_one({"id": user_id})
+        user = await user_cache.get(user_id)
         if user is None:
-            logger.warning(f"User not found with id: {user_id}")
+            auth_logger.warning("User not found", extra={"user_id": user_id})
             raise HTTPException(status_code=401, detail="User not found")
         
-        logger.info(f"Auth successful for user: {user.get('username')}")
+        auth_logger.debug("Auth successful", extra={"user_id": user_id})
         return user
     except HTTPException:
         raise
@@ -277,6 +401,7 @@ async def discord_callback(code: str = None, error: str = None):
                     "updated_at": datetime.utcnow()
                 }}
             )
+            user_cache.invalidate(existing_user["id"])
             user = await db.users.find_one({"discord_id": discord_user["id"]})
         else:
             # Create new user
@@ -341,36 +466,37 @@ async def update_user_role(user_id: str, role: UserRole, authorization: Optional
         {"id": user_id},
         {"$set": {"role": role, "updated_at": datetime.utcnow()}}
     )
+    user_cache.invalidate(user_id)
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
     return {"success": True, "message": f"User role updated to {role}"}
 
-@api_router.get("/users", response_model=List[UserResponse])
+@api_router.get("/users")
 async def get_all_users(authorization: Optional[str] = Header(None)):
-    """Get all users (admin only)"""
+    """Get all users (admin only); fields a document lacks get the UserResponse defaults"""
     current_user = await get_current_user(authorization)
     require_admin(current_user)
     
-    users = await db.users.find().to_list(1000)
-    return [UserResponse(
-        id=u["id"],
-        discord_id=u["discord_id"],
-        username=u["username"],
-        discriminator=u.get("discriminator", ""),
-        avatar=u.get("avatar"),
-        role=u.get("role", "client"),
-        created_at=u.get("created_at", datetime.utcnow())
-    ) for u in users]
+    users = await db.users.find({}, USER_PROJECTION).to_list(1000)
+    defaults = {"discriminator": "", "avatar": None, "role": "client", "created_at": datetime.utcnow()}
+    return MongoJSONResponse([{**defaults, **u} for u in users])
 
 # ============== ORDER ROUTES ==============
 
 @api_router.post("/orders")
 async def create_order(order_data: OrderCreate, authorization: Optional[str] = Header(None)):
-    """Create a new order and create Discord ticket"""
+    """Create a new order and queue its Discord ticket"""
     user = await get_current_user(authorization)
     
+    # Prices are USD and must match the catalog; the client's figure is never trusted
+    price = price_matrix.usd_price(order_data.character_id, order_data.service_type.value)
+    if price is None:
+        raise HTTPException(status_code=400, detail="Unknown character or service type")
+    if abs(order_data.price - price) > PRICE_TOLERANCE:
+        raise HTTPException(status_code=400, detail=f"Price mismatch: expected {price:.2f} USD")
+    
     new_order = Order(
         user_id=user["id"],
         discord_username=user["username"],
@@ -379,7 +505,7 @@ async def create_order(order_data: OrderCreate, authorization: Optional[str] = H
         character_name=order_data.character_name,
         character_class=order_data.character_class,
         character_icon=order_data.character_icon,
-        price=order_data.price,
+        price=price,
         payment_method=order_data.payment_method
     )
     
@@ -387,46 +513,73 @@ async def create_order(order_data: OrderCreate, authorization: Optional[str] = H
     
     logger.info(f"New order created: {new_order.id} by {user['username']}")
     
-    # Create Discord ticket channel
-    try:
-        ticket_result = await create_ticket_channel(
-            order_id=new_order.id,
-            discord_username=user["username"],
-            discord_id=user.get("discord_id", ""),
-            character_name=order_data.character_name,
-            service_type=order_data.service_type,
-            price=order_data.price
-        )
-        
-        if ticket_result:
-            # Update order with ticket channel info
-            await db.orders.update_one(
-                {"id": new_order.id},
-                {"$set": {
-                    "ticket_channel_id": ticket_result.get("channel_id"),
-                    "ticket_channel_name": ticket_result.get("channel_name")
-                }}
-            )
-            logger.info(f"Discord ticket created: {ticket_result.get('channel_name')}")
-    except Exception as e:
-        logger.error(f"Failed to create Discord ticket: {e}")
+    # Discord ticket channel is created in the background (see ticket_outbox)
+    await ticket_outbox.enqueue(new_order.id, {
+        "discord_username": user["username"],
+        "discord_id": user.get("discord_id", ""),
+        "character_name": order_data.character_name,
+        "service_type": order_data.service_type.value,
+        "price": price
+    })
     
+    order_events.publish(new_order.dict())
     return new_order.dict()
 
 @api_router.get("/orders")
-async def get_my_orders(authorization: Optional[str] = Header(None)):
-    """Get orders for current user"""
+async def get_my_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    authorization: Optional[str] = Header(None)
+):
+    """Get orders for current user (pass `cursor`, empty for the first page, to page through all of them)"""
+    user = await get_current_user(authorization)
+    
+    query = {"user_id": user["id"]}
+    if cursor is None:
+        # Without a cursor: the 100 most recent orders as a plain list
+        return MongoJSONResponse(await db.orders.find(query, ORDER_PROJECTION).sort("created_at", -1).to_list(100))
+    
+    orders, next_cursor = await fetch_page(db.orders, query, cursor, limit, ORDER_PROJECTION)
+    return MongoJSONResponse({"orders": orders, "next_cursor": next_cursor, "limit": limit})
+
+@api_router.post("/orders/stream-token")
+async def create_order_stream_token(authorization: Optional[str] = Header(None)):
+    """Mint a short-lived token for ?token= on GET /orders/stream, so the session token stays out of URLs"""
     user = await get_current_user(authorization)
+    return {"token": create_stream_token(user["id"]), "expires_in": STREAM_TOKEN_SECONDS}
+
+@api_router.get("/orders/stream")
+async def stream_my_orders(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events with the current user's order changes
+    EventSource cannot send headers, so ?token= takes a stream token from POST /orders/stream-token
+    """
+    if authorization:
+        user = await get_current_user(authorization)
+    else:
+        payload = decode_access_token(token) if token else None
+        if payload is None or payload.get("type") != STREAM_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Invalid stream token")
+        user = await user_cache.get(payload.get("user_id"))
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
     
-    orders = await db.orders.find({"user_id": user["id"]}).sort("created_at", -1).to_list(100)
-    return orders
+    return StreamingResponse(
+        order_events.stream(user["id"], request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @api_router.get("/orders/{order_id}")
 async def get_order(order_id: str, authorization: Optional[str] = Header(None)):
     """Get specific order"""
     user = await get_current_user(authorization)
     
-    order = await db.orders.find_one({"id": order_id})
+    order = await db.orders.find_one({"id": order_id}, ORDER_PROJECTION)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -434,26 +587,14 @@ async def get_order(order_id: str, authorization: Optional[str] = Header(None)):
     if order["user_id"] != user["id"] and user.get("role") not in [UserRole.admin, UserRole.booster]:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return order
+    return MongoJSONResponse(order)
 
-@api_router.patch("/orders/{order_id}")
-async def update_order(order_id: str, order_update: OrderUpdate, authorization: Optional[str] = Header(None)):
-    """Update order (admin/booster only)"""
-    user = await get_current_user(authorization)
-    require_admin_or_booster(user)
-    
-    order = await db.orders.find_one({"id": order_id})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    update_data = {"updated_at": datetime.utcnow()}
-    status_changed = False
-    old_status = order.get("status")
+async def order_update_fields(order_update: OrderUpdate, now: datetime) -> dict:
+    """$set document for an order update; booster_username is denormalized from the user cache"""
+    update_data = {"updated_at": now}
     
     if order_update.status is not None:
         update_data["status"] = order_update.status
-        if order_update.status != old_status:
-            status_changed = True
     if order_update.progress is not None:
         update_data["progress"] = order_update.progress
     if order_update.notes is not None:
@@ -461,49 +602,197 @@ async def update_order(order_id: str, order_update: OrderUpdate, authorization:
     if order_update.eta is not None:
         update_data["eta"] = order_update.eta
     if order_update.booster_id is not None:
-        booster = await db.users.find_one({"id": order_update.booster_id})
+        booster = await user_cache.get(order_update.booster_id)
         if booster:
             update_data["booster_id"] = order_update.booster_id
             update_data["booster_username"] = booster["username"]
     
-    await db.orders.update_one({"id": order_id}, {"$set": update_data})
+    return update_data
+
+@api_router.patch("/orders/{order_id}")
+async def update_order(order_id: str, order_update: OrderUpdate, authorization: Optional[str] = Header(None)):
+    """Update order (admin/booster only) in a single find_one_and_update"""
+    user = await get_current_user(authorization)
+    require_admin_or_booster(user)
     
-    # Send Discord notification if status changed
-    if status_changed and order.get("ticket_channel_id"):
-        try:
-            status_emoji = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
-            status_display = {"pending": "Pending", "in_progress": "In Progress", "completed": "Completed"}
-            new_status = order_update.status
-            
-            embed = {
-                "title": f"{status_emoji.get(new_status, '📋')} Order Status Updated",
-                "color": 65489 if new_status == "completed" else 16776960,
-                "fields": [
-                    {"name": "New Status", "value": status_display.get(new_status, new_status), "inline": True},
-                    {"name": "Progress", "value": f"{order_update.progress or order.get('progress', 0)}%", "inline": True}
-                ],
-                "footer": {"text": f"Updated by {user['username']}"},
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            if order_update.notes:
-                embed["fields"].append({"name": "Notes", "value": order_update.notes[:200], "inline": False})
-            
-            await send_ticket_update(order["ticket_channel_id"], "", embed)
-        except Exception as e:
-            logger.error(f"Failed to send Discord update: {e}")
+    update_data = await order_update_fields(order_update, datetime.utcnow())
+    
+    query = {"id": order_id}
+    if order_update.version is not None:
+        query["version"] = order_update.version
+    
+    # The pre-update document tells whether the status changed; the updated
+    # order is that document with the same $set/$inc applied
+    previous = await db.orders.find_one_and_update(
+        query,
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection=ORDER_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        if order_update.version is not None:
+            current = await db.orders.find_one({"id": order_id}, {"_id": 0, "version": 1})
+            if current:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Order was modified (current version {current.get('version', 0)}), reload and retry"
+                )
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    updated_order = {**previous, **update_data, "version": previous.get("version", 0) + 1}
+    order_events.publish(updated_order)
+    
+    status_changed = "status" in update_data and update_data["status"] != previous.get("status")
+    if status_changed:
+        # Keep the completed counter in step with real transitions only
+        was_completed = previous.get("status") == OrderStatus.completed
+        is_completed = update_data["status"] == OrderStatus.completed
+        if is_completed != was_completed:
+            await completed_orders.increment(1 if is_completed else -1)
+    
+    # Send Discord notification if status changed, without holding up the response
+    if status_changed and previous.get("ticket_channel_id"):
+        background.spawn(
+            notify_order_status(updated_order, order_update.notes, user["username"]),
+            name=f"order-status-{order_id}"
+        )
+    
+    return MongoJSONResponse(updated_order)
+
+async def notify_order_status(order: dict, notes: Optional[str], updated_by: str):
+    """Post the order status embed to the order's ticket channel"""
+    try:
+        status_emoji = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
+        status_display = {"pending": "Pending", "in_progress": "In Progress", "completed": "Completed"}
+        new_status = order["status"]
+        
+        embed = {
+            "title": f"{status_emoji.get(new_status, '📋')} Order Status Updated",
+            "color": 65489 if new_status == "completed" else 16776960,
+            "fields": [
+                {"name": "New Status", "value": status_display.get(new_status, new_status), "inline": True},
+                {"name": "Progress", "value": f"{order.get('progress', 0)}%", "inline": True}
+            ],
+            "footer": {"text": f"Updated by {updated_by}"},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        if notes:
+            embed["fields"].append({"name": "Notes", "value": notes[:200], "inline": False})
+        
+        await send_ticket_update(order["ticket_channel_id"], "", embed)
+    except Exception as e:
+        logger.error(f"Failed to send Discord update: {e}")
+
+async def notify_order_statuses(notifications: List[tuple], concurrency: int):
+    """Post status embeds for several orders, at most `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def notify(order, notes, updated_by):
+        async with semaphore:
+            await notify_order_status(order, notes, updated_by)
+    
+    await asyncio.gather(*(notify(*n) for n in notifications))
+
+@api_router.patch("/admin/orders")
+async def bulk_update_orders(request_data: OrderBulkRequest, authorization: Optional[str] = Header(None)):
+    """
+    Update many orders in one bulk_write (admin/booster only)
+    Each item is an order update plus its `id`; results are reported per item
+    """
+    user = await get_current_user(authorization)
+    require_admin_or_booster(user)
+    
+    # Mongo keeps milliseconds; truncate so the stamp can be compared after a re-read
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    
+    items = request_data.updates
+    ids = [item.id for item in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Each order may only appear once")
+    current = {
+        order["id"]: order
+        for order in await db.orders.find({"id": {"$in": ids}}, ORDER_PROJECTION).to_list(len(ids))
+    }
+    fields = await asyncio.gather(*(order_update_fields(item, now) for item in items))
+    
+    results = {}
+    operations = []
+    pending = []
+    for item, update_data in zip(items, fields):
+        previous = current.get(item.id)
+        if previous is None:
+            results[item.id] = {"id": item.id, "success": False, "error": "not_found"}
+            continue
+        version = previous.get("version", 0)
+        if item.version is not None and item.version != version:
+            results[item.id] = {"id": item.id, "success": False, "error": "conflict", "version": version}
+            continue
+        # Precondition on the version just read, so `previous` is what gets updated
+        query = {"id": item.id, "version": version} if "version" in previous else {"id": item.id, "version": {"$exists": False}}
+        operations.append(UpdateOne(query, {"$set": update_data, "$inc": {"version": 1}}))
+        pending.append((item, previous, update_data))
+    
+    applied = set()
+    if operations:
+        result = await db.orders.bulk_write(operations, ordered=False)
+        if result.matched_count == len(operations):
+            applied = {item.id for item, _, _ in pending}
+        else:
+            # Some orders changed between the read and the write; find the ones we updated
+            expected = {item.id: previous.get("version", 0) + 1 for item, previous, _ in pending}
+            after = await db.orders.find(
+                {"id": {"$in": list(expected)}, "updated_at": now},
+                {"_id": 0, "id": 1, "version": 1}
+            ).to_list(len(expected))
+            applied = {order["id"] for order in after if order.get("version") == expected[order["id"]]}
+    
+    completed_delta = 0
+    notifications = []
+    for item, previous, update_data in pending:
+        if item.id not in applied:
+            results[item.id] = {"id": item.id, "success": False, "error": "conflict"}
+            continue
+        order = {**previous, **update_data, "version": previous.get("version", 0) + 1}
+        results[item.id] = {"id": item.id, "success": True, "order": order}
+        order_events.publish(order)
+        if "status" in update_data and update_data["status"] != previous.get("status"):
+            was_completed = previous.get("status") == OrderStatus.completed
+            is_completed = update_data["status"] == OrderStatus.completed
+            completed_delta += int(is_completed) - int(was_completed)
+            if order.get("ticket_channel_id"):
+                notifications.append((order, item.notes, user["username"]))
+    
+    if completed_delta:
+        await completed_orders.increment(completed_delta)
+    if notifications:
+        background.spawn(
+            notify_order_statuses(notifications, BULK_NOTIFY_CONCURRENCY),
+            name="bulk-order-status"
+        )
     
-    updated_order = await db.orders.find_one({"id": order_id})
-    return updated_order
+    updated = sum(1 for r in results.values() if r["success"])
+    return MongoJSONResponse({
+        "updated": updated,
+        "failed": len(ids) - updated,
+        "results": [results[order_id] for order_id in ids]
+    })
 
 @api_router.get("/admin/orders")
 async def get_all_orders(
     status: Optional[OrderStatus] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     authorization: Optional[str] = Header(None)
 ):
-    """Get all orders (admin/booster only)"""
+    """
+    Get all orders (admin/booster only)
+    With `cursor` (empty for the first page) pages by keyset instead of page number;
+    the total is then only computed on request, estimated when unfiltered
+    """
     user = await get_current_user(authorization)
     require_admin_or_booster(user)
     
@@ -511,17 +800,24 @@ async def get_all_orders(
     if status:
         query["status"] = status
     
+    if cursor is not None:
+        orders, next_cursor = await fetch_page(db.orders, query, cursor, limit, ORDER_PROJECTION)
+        result = {"orders": orders, "next_cursor": next_cursor, "limit": limit}
+        if include_total:
+            result["total"] = await db.orders.count_documents(query) if query else await db.orders.estimated_document_count()
+        return MongoJSONResponse(result)
+    
     skip = (page - 1) * limit
-    orders = await db.orders.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    orders = await db.orders.find(query, ORDER_PROJECTION).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
     total = await db.orders.count_documents(query)
     
-    return {
+    return MongoJSONResponse({
         "orders": orders,
         "total": total,
         "page": page,
         "limit": limit,
         "pages": (total + limit - 1) // limit
-    }
+    })
 
 @api_router.get("/admin/boosters")
 async def get_boosters(authorization: Optional[str] = Header(None)):
@@ -529,25 +825,40 @@ async def get_boosters(authorization: Optional[str] = Header(None)):
     user = await get_current_user(authorization)
     require_admin_or_booster(user)
     
-    boosters = await db.users.find({"role": {"$in": ["booster", "admin"]}}).to_list(100)
+    boosters, stats = await asyncio.gather(
+        db.users.find({"role": {"$in": ["booster", "admin"]}}).to_list(100),
+        booster_stats.by_booster()
+    )
     
     result = []
     for booster in boosters:
-        # Count completed orders
-        completed_count = await db.orders.count_documents({
-            "booster_id": booster["id"],
-            "status": "completed"
-        })
+        counts = stats.get(booster["id"], NO_BOOSTER_STATS)
         result.append({
             "id": booster["id"],
             "username": booster["username"],
             "avatar": booster.get("avatar"),
             "role": booster.get("role"),
-            "orders_completed": completed_count
+            "orders_completed": counts["orders_completed"],
+            "orders_in_progress": counts["orders_in_progress"],
+            "revenue": counts["revenue"],
+            # Whether the user currently holds a booster role in the Discord server
+            "discord_booster": booster_index.contains(booster.get("discord_id"))
         })
     
     return result
 
+@api_router.get("/admin/boosters/discord")
+async def get_discord_boosters(authorization: Optional[str] = Header(None)):
+    """Members holding a booster role in the Discord server (admin/booster only)"""
+    user = await get_current_user(authorization)
+    require_admin_or_booster(user)
+    
+    return {
+        "count": booster_index.count(),
+        "ready": booster_index.ready,
+        "boosters": booster_index.list()
+    }
+
 # ============== SERVICES/CHARACTERS ROUTES ==============
 
 # Character data (same as frontend)
@@ -612,99 +923,66 @@ SERVICE_TYPES = [
     {"id": "lord-boosting", "name": "Lord Boosting", "description": "We do the farm for you", "priceModifier": 10}
 ]
 
+# The catalog is fixed for the life of the process: serialize and compress it once
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 300))
+SERVICES_PAYLOAD = StaticPayload(SERVICE_TYPES, max_age=CATALOG_MAX_AGE)
+CHARACTERS_PAYLOAD = StaticPayload(CHARACTERS, max_age=CATALOG_MAX_AGE)
+CHARACTER_CLASS_PAYLOADS = {
+    character_class: StaticPayload(CHARACTERS.get(character_class.value, []), max_age=CATALOG_MAX_AGE)
+    for character_class in CharacterClass
+}
+
+# Catalog prices in every currency, recomputed when the exchange rates change
+price_matrix = PriceMatrix(CHARACTERS, SERVICE_TYPES, currency_rates, max_age=CATALOG_MAX_AGE)
+
 @api_router.get("/services")
-async def get_services():
+async def get_services(request: Request):
     """Get all service types"""
-    return SERVICE_TYPES
+    return SERVICES_PAYLOAD.response(request)
 
 @api_router.get("/vouches")
-async def get_vouches(limit: int = Query(20, ge=1, le=50)):
-    """Get vouches/feedback from Discord channel"""
-    vouches = await fetch_vouches(limit)
-    return vouches
+async def get_vouches(response: Response, limit: int = Query(20, ge=1, le=50)):
+    """Get vouches/feedback synced from the Discord channel"""
+    if vouch_store.stale:
+        response.headers.update(STALE_HEADERS)
+    return await vouch_store.latest(limit)
 
 @api_router.get("/discord/info")
-async def get_discord_info():
-    """Get Discord server info"""
-    info = await get_guild_info()
-    return info or {"name": "The Rival Syndicate", "icon": None, "member_count": 0}
+async def get_discord_info(response: Response):
+    """Get Discord server info (served from the background copy, flagged stale while Discord is unavailable)"""
+    if guild_info.stale:
+        response.headers.update(STALE_HEADERS)
+    return guild_info.to_dict()
 
 @api_router.get("/stats")
-async def get_stats():
-    """Get site statistics from Discord"""
-    guild_info = await get_guild_info()
-    orders_count = await get_orders_count()
-    
-    # Get active boosters count from Discord roles
-    booster_count = await get_active_boosters_count()
-    
-    return {
-        "orders_completed": orders_count,
-        "server_members": guild_info.get("member_count", 0) if guild_info else 0,
-        "active_boosters": booster_count if booster_count > 0 else 0,
-        "average_rating": 4.9
-    }
-
-# Currency exchange rates cache
-EXCHANGE_RATES_CACHE = {
-    "rates": None,
-    "last_updated": None
-}
+async def get_stats(response: Response):
+    """Get site statistics (served from the background stats snapshot)"""
+    if stats_snapshot.stale:
+        response.headers.update(STALE_HEADERS)
+    return stats_snapshot.to_dict()
+
+@api_router.get("/prices")
+async def get_prices(request: Request, currency: str = Query("USD", min_length=3, max_length=3)):
+    """Price of every character x service type in `currency` ({character_id: {service_type: price}})"""
+    response = price_matrix.response(currency, request)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"No exchange rate for {currency}")
+    return response
 
 @api_router.get("/currency/rates")
-async def get_exchange_rates():
-    """Get currency exchange rates (base USD)"""
-    from datetime import datetime, timedelta
-    
-    # Check cache (refresh every hour)
-    if EXCHANGE_RATES_CACHE["rates"] and EXCHANGE_RATES_CACHE["last_updated"]:
-        if datetime.utcnow() - EXCHANGE_RATES_CACHE["last_updated"] < timedelta(hours=1):
-            return EXCHANGE_RATES_CACHE["rates"]
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            # Using exchangerate-api.com free tier
-            response = await client.get(
-                "https://api.exchangerate-api.com/v4/latest/USD",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                rates = {
-                    "base": "USD",
-                    "rates": data.get("rates", {}),
-                    "updated": datetime.utcnow().isoformat()
-                }
-                
-                # Update cache
-                EXCHANGE_RATES_CACHE["rates"] = rates
-                EXCHANGE_RATES_CACHE["last_updated"] = datetime.utcnow()
-                
-                return rates
-    except Exception as e:
-        logger.error(f"Error fetching exchange rates: {e}")
-    
-    # Fallback rates
-    return {
-        "base": "USD",
-        "rates": {
-            "USD": 1, "EUR": 0.92, "GBP": 0.79, "CAD": 1.36, "AUD": 1.53,
-            "JPY": 149.50, "INR": 83.12, "BRL": 4.97, "MXN": 17.15,
-            "CNY": 7.24, "KRW": 1298.50, "PHP": 55.80, "SGD": 1.34
-        },
-        "updated": datetime.utcnow().isoformat()
-    }
+async def get_exchange_rates(request: Request):
+    """Get currency exchange rates (base USD), refreshed in the background"""
+    return currency_rates.response(request)
 
 @api_router.get("/characters")
-async def get_all_characters():
+async def get_all_characters(request: Request):
     """Get all characters grouped by class"""
-    return CHARACTERS
+    return CHARACTERS_PAYLOAD.response(request)
 
 @api_router.get("/characters/{character_class}")
-async def get_characters_by_class(character_class: CharacterClass):
+async def get_characters_by_class(character_class: CharacterClass, request: Request):
     """Get characters by class"""
-    return CHARACTERS.get(character_class, [])
+    return CHARACTER_CLASS_PAYLOADS[character_class].response(request)
 
 # ============== ROOT ROUTE ==============
 
@@ -712,8 +990,8 @@ async def get_characters_by_class(character_class: CharacterClass):
 async def root():
     return {"message": "The Rival Syndicate API", "status": "online"}
 
-# Include the router
-app.include_router(api_router)
+# Per-route latency and status counts for /api/metrics
+app.add_middleware(MetricsMiddleware)
 
 # CORS
 app.add_middleware(
@@ -726,28 +1004,36 @@ app.add_middleware(
 
 # ============== DISCORD INTERACTIONS ==============
 from fastapi import Request
-from nacl.signing import VerifyKey
-from nacl.exceptions import BadSignatureError
+import orjson
+from interaction_verifier import InteractionVerifier
 
-# Discord public key for signature verification
+# Discord public key for signature verification, parsed once
 DISCORD_PUBLIC_KEY = os.environ.get('DISCORD_PUBLIC_KEY', '')
+interaction_verifier = InteractionVerifier(
+    DISCORD_PUBLIC_KEY,
+    max_age=float(os.environ.get('DISCORD_INTERACTION_MAX_AGE', 300))
+)
 
-def verify_discord_signature(signature: str, timestamp: str, body: bytes) -> bool:
-    """Verify Discord interaction signature"""
-    if not DISCORD_PUBLIC_KEY:
-        logger.warning("DISCORD_PUBLIC_KEY not set, skipping verification")
-        return True  # Skip verification if key not set (for testing)
-    
-    try:
-        verify_key = VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
-        verify_key.verify(f"{timestamp}{body.decode('utf-8')}".encode(), bytes.fromhex(signature))
+async def complete_order(query: dict) -> bool:
+    """
+    Move the order matching `query` to completed and count it
+    Returns False when no order matched or it was already completed
+    """
+    order = await db.orders.find_one_and_update(
+        {**query, "status": {"$ne": OrderStatus.completed}},
+        {"$set": {"status": OrderStatus.completed, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+        projection=ORDER_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if order:
+        await completed_orders.increment()
+        order_events.publish(order)
         return True
-    except BadSignatureError:
-        logger.error("Invalid Discord signature")
-        return False
-    except Exception as e:
-        logger.error(f"Signature verification error: {e}")
-        return False
+    return False
+
+async def complete_ticket_order(channel_id: str):
+    """Mark the order behind a ticket channel as completed (/complete slash command)"""
+    await complete_order({"ticket_channel_id": channel_id})
 
 @app.post("/api/discord/interactions")
 async def discord_interactions(request: Request):
@@ -762,14 +1048,16 @@ async def discord_interactions(request: Request):
     # Get raw body
     body = await request.body()
     
-    # Verify signature
-    if not verify_discord_signature(signature, timestamp, body):
+    # Verify signature over the raw bytes (stale timestamps are rejected first)
+    if not interaction_verifier.verify(signature, timestamp, body):
         raise HTTPException(status_code=401, detail="Invalid request signature")
     
-    # Parse JSON body
+    # Parse JSON body, once, from the same bytes
     try:
-        interaction_data = await request.json()
-    except:
+        interaction_data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(interaction_data, dict):
         raise HTTPException(status_code=400, detail="Invalid JSON")
     
     interaction_type = interaction_data.get("type")
@@ -780,7 +1068,7 @@ async def discord_interactions(request: Request):
         return {"type": 1}
     
     # Handle other interaction types
-    return await handle_interaction(interaction_data)
+    return await handle_interaction(interaction_data, on_complete=complete_ticket_order, booster_index=booster_index)
 
 @api_router.post("/tickets/{channel_id}/close")
 async def close_ticket(channel_id: str, authorization: Optional[str] = Header(None)):
@@ -792,12 +1080,7 @@ async def close_ticket(channel_id: str, authorization: Optional[str] = Header(No
     
     if success:
         # Update order status if we can find it
-        order = await db.orders.find_one({"ticket_channel_id": channel_id})
-        if order:
-            await db.orders.update_one(
-                {"id": order["id"]},
-                {"$set": {"status": "completed", "updated_at": datetime.utcnow()}}
-            )
+        await complete_order({"ticket_channel_id": channel_id})
         
         return {"success": True, "message": "Ticket closed successfully"}
     else:
@@ -809,19 +1092,94 @@ async def register_commands(authorization: Optional[str] = Header(None)):
     user = await get_current_user(authorization)
     require_admin(user)
     
-    success = await register_slash_commands()
+    success = await command_sync.force()
     
     if success:
         return {"success": True, "message": "Slash commands registered successfully"}
     else:
         raise HTTPException(status_code=500, detail="Failed to register commands")
 
+@api_router.get("/admin/cache")
+async def get_cache_stats(authorization: Optional[str] = Header(None)):
+    """In-process cache sizes and hit/miss counters (admin only)"""
+    user = await get_current_user(authorization)
+    require_admin(user)
+    
+    return {"users": user_cache.stats()}
+
+@api_router.get("/discord/ratelimits")
+async def get_discord_ratelimits(authorization: Optional[str] = Header(None)):
+    """Discord rate-limit queue depth and wait time per bucket, and circuit breaker states (admin only)"""
+    user = await get_current_user(authorization)
+    require_admin(user)
+
+    return discord_client.stats()
+
+# Bearer token for scrapers that cannot log in; admins can always read the metrics
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+def collect_component_metrics():
+    """Gauges read from caches, queues and streams at scrape time"""
+    cache = user_cache.stats()
+    ratelimits = discord_client.stats()
+    return (
+        gauge("user_cache_entries", "Cached users", {(): cache["size"]})
+        + gauge("user_cache_lookups", "User cache lookups by result", {
+            (("result", "hit"),): cache["hits"],
+            (("result", "miss"),): cache["misses"],
+            (("result", "coalesced"),): cache["coalesced"]
+        })
+        + gauge("discord_ratelimit_queued", "Discord calls waiting on a rate-limit bucket", {(): ratelimits["queued"]})
+        + gauge("discord_ratelimit_wait_seconds", "Total time spent waiting on Discord rate limits", {(): ratelimits["total_wait"]})
+        + gauge("order_stream_subscribers", "Open order SSE streams", {(): order_events.subscriber_count()})
+        + gauge("discord_circuit_open", "1 while the circuit for a Discord endpoint is open or half-open", {
+            (("endpoint", name),): int(state["state"] != "closed")
+            for name, state in ratelimits["breakers"].items()
+        })
+    )
+
+metrics_registry.collectors.append(collect_component_metrics)
+
+@api_router.get("/metrics")
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text exposition for this process (admin only, or METRICS_TOKEN)"""
+    if not (METRICS_TOKEN and authorization and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")):
+        user = await get_current_user(authorization)
+        require_admin(user)
+
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+# Include the router (after every route above has been declared)
+app.include_router(api_router)
+
 @app.on_event("startup")
 async def startup_event():
-    """Register Discord slash commands on startup"""
-    logger.info("Registering Discord slash commands...")
-    await register_slash_commands()
+    """Ensure indexes, open the shared Discord client, start workers and register slash commands on startup"""
+    await ensure_indexes(db)
+    await discord_client.start()
+    await ticket_outbox.start()
+    await vouch_store.start()
+    await booster_index.start()
+    # One-off backfill of the completed orders counter from the orders channel
+    background.spawn(completed_orders.seed(get_orders_count), name="seed-completed-orders")
+    await guild_info.start()
+    await stats_snapshot.start()
+    await booster_stats.start()
+    await order_events.start()
+    await currency_rates.start()
+    # Off the startup path: the app serves traffic even if Discord is unreachable
+    background.spawn(command_sync.run(), name="slash-command-sync")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await ticket_outbox.stop()
+    await vouch_store.stop()
+    await stats_snapshot.stop()
+    await guild_info.stop()
+    await booster_index.stop()
+    await booster_stats.stop()
+    await order_events.stop()
+    await currency_rates.stop()
+    await background.cancel_all()
+    await discord_client.aclose()
     client.close()
@@ -0,0 +1,76 @@
+"""
+Responses for content that changes rarely (catalog endpoints, currency rates)
+The JSON body, its gzip/brotli variants and a content-hash ETag are computed once per content;
+requests only pick a variant or answer 304 Not Modified
+"""
+import gzip
+import hashlib
+from typing import Any, Dict, Optional, Set
+
+from fastapi import Request, Response
+
+from responses import dumps
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    """Codings from Accept-Encoding, leaving out any with q=0"""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticPayload:
+    """
+    Each encoding has its own strong ETag ("<hash>", "<hash>-gzip", "<hash>-br");
+    If-None-Match against any of them is a 304 since they share one body
+    """
+
+    def __init__(self, content: Any, max_age: int = 300):
+        self.body = dumps(content)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.variants: Dict[Optional[str], bytes] = {None: self.body}
+        self.etags: Dict[Optional[str], str] = {None: f'"{digest}"'}
+        self.variants["gzip"] = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etags["gzip"] = f'"{digest}-gzip"'
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(self.body)
+            self.etags["br"] = f'"{digest}-br"'
+        self.cache_control = f"public, max-age={max_age}"
+
+    def _not_modified(self, if_none_match: str) -> bool:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        # If-None-Match uses weak comparison, so W/"..." matches as well
+        tags = {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+        return not tags.isdisjoint(self.etags.values())
+
+    def _encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return None
+
+    def response(self, request: Request) -> Response:
+        encoding = self._encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._not_modified(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type="application/json", headers=headers)
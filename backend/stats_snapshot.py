@@ -0,0 +1,107 @@
+"""
+Background snapshot of the public site statistics (GET /api/stats)
+Recomputed on an interval; requests are served from memory
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from background import Periodic
+from last_good import LastKnownGood
+
+logger = logging.getLogger(__name__)
+
+AVERAGE_RATING = 4.9
+
+
+class StatsSnapshot(Periodic):
+    """
+    Holds the last computed stats
+    A part that fails to refresh keeps its previous value; generated_at only
+    moves forward when every part refreshed successfully
+    With a `store`, complete snapshots are persisted and a new process whose parts
+    fail starts from the stored values instead of zeros
+    """
+
+    def __init__(self, booster_index, completed_orders, guild_info, refresh_interval: float = 60.0, store: Optional[LastKnownGood] = None):
+        self.booster_index = booster_index
+        self.completed_orders = completed_orders
+        # GuildInfoSnapshot; its own refresh is the only reader of the guild endpoint
+        self.guild_info = guild_info
+        self.refresh_interval = refresh_interval
+        self.orders_completed = 0
+        self.server_members = 0
+        self.active_boosters = 0
+        self.generated_at: Optional[datetime] = None
+        self.stale = False
+        self.store = store
+        # Parts refreshed at least once by this process
+        self._fresh = set()
+        super().__init__(self.refresh, refresh_interval, name="stats-snapshot")
+
+    async def refresh(self) -> bool:
+        """Recompute the snapshot; returns True when every part was refreshed"""
+        try:
+            orders_count = await self.completed_orders.get()
+        except Exception as e:
+            logger.error(f"Failed to read completed orders count: {e}")
+            orders_count = None
+        # Maintained by their own refresh loops; stale/None until those have succeeded
+        guild_info = None if self.guild_info.stale else self.guild_info.info
+        booster_count = self.booster_index.count() if self.booster_index.ready else None
+
+        complete = True
+        if isinstance(guild_info, dict):
+            self.server_members = guild_info.get("member_count", 0)
+            self._fresh.add("server_members")
+        else:
+            complete = False
+        if isinstance(orders_count, int):
+            self.orders_completed = orders_count
+            self._fresh.add("orders_completed")
+        else:
+            complete = False
+        if isinstance(booster_count, int):
+            self.active_boosters = max(booster_count, 0)
+            self._fresh.add("active_boosters")
+        else:
+            complete = False
+
+        self.stale = not complete
+        if complete:
+            self.generated_at = datetime.utcnow()
+            if self.store:
+                await self.store.save(self._counts())
+        else:
+            logger.warning("Stats refresh incomplete, keeping last good values")
+            if self.store and self.generated_at is None:
+                await self._restore()
+        return complete
+
+    def _counts(self) -> Dict:
+        return {
+            "orders_completed": self.orders_completed,
+            "server_members": self.server_members,
+            "active_boosters": self.active_boosters
+        }
+
+    async def _restore(self):
+        """Fill the parts this process never refreshed from the stored snapshot"""
+        stored = await self.store.load()
+        if not stored:
+            return
+        counts, saved_at = stored
+        for field, value in counts.items():
+            if field not in self._fresh:
+                setattr(self, field, value)
+        self.generated_at = saved_at
+
+    def to_dict(self) -> Dict:
+        return {
+            "orders_completed": self.orders_completed,
+            "server_members": self.server_members,
+            "active_boosters": self.active_boosters,
+            "average_rating": AVERAGE_RATING,
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+            "stale": self.stale
+        }
@@ -0,0 +1,246 @@
+"""
+Durable outbox for Discord ticket creation
+POST /orders only records a job; a worker creates the ticket channel afterwards,
+retrying with exponential backoff, and fills in the order's ticket fields
+"""
+import uuid
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from background import spawn, every
+from discord_bot import create_ticket_channel
+
+logger = logging.getLogger(__name__)
+
+# Order.ticket_status values
+TICKET_PENDING = "pending"
+TICKET_CREATED = "created"
+TICKET_FAILED = "failed"
+
+
+class TicketOutbox:
+    """
+    Mongo-backed job queue (collection `ticket_outbox`) for ticket channels
+    Jobs survive restarts: a job left "processing" by a dead worker is picked up
+    again once its lease expires. Each Discord call of an attempt is bounded so the
+    attempt ends within its lease, and the channel is recorded on the job as soon as it
+    exists, so a job that is picked up again never creates a second channel
+    The order and its job are separate writes; a periodic recovery pass enqueues
+    jobs for orders still waiting on a ticket without one
+    """
+
+    def __init__(
+        self,
+        db,
+        create_ticket: Callable[..., Awaitable[Optional[Dict]]] = create_ticket_channel,
+        workers: int = 1,
+        max_attempts: int = 6,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+        recover_after: float = 60.0,
+        recover_interval: float = 300.0
+    ):
+        self.jobs = db.ticket_outbox
+        self.orders = db.orders
+        self.users = db.users
+        self.create_ticket = create_ticket
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        # An attempt makes up to three Discord calls (find, create, welcome message)
+        self.request_deadline = lease_seconds / 4
+        self.poll_interval = poll_interval
+        self.recover_after = recover_after
+        self.recover_interval = recover_interval
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    async def enqueue(self, order_id: str, payload: Dict):
+        """
+        Record a ticket job for an order; payload holds create_ticket_channel kwargs
+        Idempotent: an order that already has a job keeps it (unique index on order_id)
+        """
+        now = datetime.utcnow()
+        await self.jobs.update_one(
+            {"order_id": order_id},
+            {"$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "order_id": order_id,
+                "payload": payload,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "lease_until": None,
+                "last_error": None,
+                "created_at": now,
+                "updated_at": now
+            }},
+            upsert=True
+        )
+        self._wakeup.set()
+
+    async def recover(self) -> int:
+        """Enqueue jobs for orders left waiting on a ticket with no job; returns how many"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.recover_after)
+        orders = await self.orders.find(
+            {"ticket_status": TICKET_PENDING, "created_at": {"$lte": cutoff}},
+            {"_id": 0, "id": 1, "user_id": 1, "discord_username": 1, "character_name": 1, "service_type": 1, "price": 1}
+        ).to_list(500)
+        if not orders:
+            return 0
+
+        with_job = {
+            job["order_id"] async for job in
+            self.jobs.find({"order_id": {"$in": [o["id"] for o in orders]}}, {"_id": 0, "order_id": 1})
+        }
+        orphans = [o for o in orders if o["id"] not in with_job]
+        if not orphans:
+            return 0
+
+        discord_ids = {
+            user["id"]: user.get("discord_id", "") async for user in
+            self.users.find({"id": {"$in": list({o["user_id"] for o in orphans})}}, {"_id": 0, "id": 1, "discord_id": 1})
+        }
+        for order in orphans:
+            await self.enqueue(order["id"], {
+                "discord_username": order["discord_username"],
+                "discord_id": discord_ids.get(order["user_id"], ""),
+                "character_name": order["character_name"],
+                "service_type": order["service_type"],
+                "price": order["price"]
+            })
+        logger.warning(f"Recovered {len(orphans)} order(s) that had no ticket job")
+        return len(orphans)
+
+    async def start(self):
+        for i in range(self.workers):
+            self._tasks.append(spawn(self._run(), name=f"ticket-outbox-{i}"))
+        self._tasks.append(every(self.recover_interval, self.recover, name="ticket-outbox-recover"))
+        logger.info(f"Ticket outbox started with {self.workers} worker(s)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self) -> Optional[Dict]:
+        now = datetime.utcnow()
+        return await self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "processing", "lease_until": {"$lte": now}}
+            ]},
+            {
+                "$set": {
+                    "status": "processing",
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _record_channel(self, job: Dict, channel: Dict):
+        await self.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {"channel": channel, "updated_at": datetime.utcnow()}}
+        )
+
+    async def _process(self, job: Dict):
+        order_id = job["order_id"]
+        channel = job.get("channel")
+        error = None
+        if channel and channel.get("ready"):
+            # Ticket done by an earlier attempt; only the order update is left
+            result = channel
+        else:
+            try:
+                result = await self.create_ticket(
+                    order_id=order_id,
+                    **job["payload"],
+                    channel=channel,
+                    on_created=lambda created: self._record_channel(job, created),
+                    find_existing=job["attempts"] > 1 and channel is None,
+                    deadline=self.request_deadline
+                )
+            except Exception as e:
+                result = None
+                error = repr(e)
+
+        now = datetime.utcnow()
+        if result:
+            if not result.get("ready"):
+                result = {**result, "ready": True}
+                await self._record_channel(job, result)
+            await self.orders.update_one(
+                {"id": order_id},
+                {"$set": {
+                    "ticket_channel_id": result.get("channel_id"),
+                    "ticket_channel_name": result.get("channel_name"),
+                    "ticket_status": TICKET_CREATED
+                }}
+            )
+            await self.jobs.delete_one({"id": job["id"]})
+            logger.info(f"Discord ticket created for order {order_id}: {result.get('channel_name')}")
+            return
+
+        error = error or "Discord did not create the ticket channel"
+        if job["attempts"] >= self.max_attempts:
+            await self.jobs.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": "failed", "last_error": error, "lease_until": None, "updated_at": now}}
+            )
+            await self.orders.update_one({"id": order_id}, {"$set": {"ticket_status": TICKET_FAILED}})
+            logger.error(f"Giving up on Discord ticket for order {order_id} after {job['attempts']} attempts: {error}")
+            return
+
+        delay = self._backoff(job["attempts"])
+        await self.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {
+                "status": "pending",
+                "last_error": error,
+                "lease_until": None,
+                "next_attempt_at": now + timedelta(seconds=delay),
+                "updated_at": now
+            }}
+        )
+        logger.warning(f"Discord ticket for order {order_id} failed (attempt {job['attempts']}), retrying in {delay:.1f}s")
+
+    async def _run(self):
+        while True:
+            # Clear before claiming so an enqueue during the claim is not missed
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Ticket outbox claim failed: {e}")
+                job = None
+
+            if job:
+                try:
+                    await self._process(job)
+                except Exception as e:
+                    logger.error(f"Ticket outbox job {job.get('id')} errored: {e}")
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
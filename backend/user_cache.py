@@ -0,0 +1,99 @@
+"""
+In-process cache of user documents for get_current_user
+Bounded LRU with a TTL; concurrent misses for the same user share one lookup
+"""
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+class UserCache:
+    """
+    user_id -> user document
+    Invalidation is per process, so the TTL bounds how stale other workers can be
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[Dict]]],
+        max_size: int = 1000,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.loader = loader
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Bumped on every invalidation so a lookup that started earlier is not cached
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, user_id: str) -> Optional[Dict]:
+        """Return a copy of the user document, or None when the user does not exist"""
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, doc = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return dict(doc)
+            del self._entries[user_id]
+
+        task = self._inflight.get(user_id)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The lookup runs in its own task so cancelling any one caller (the first included)
+            # does not cancel it for the others
+            task = asyncio.ensure_future(self._load(user_id, self._version))
+            # Every caller may have been cancelled; don't warn about an unretrieved exception
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[user_id] = task
+
+        doc = await asyncio.shield(task)
+        return dict(doc) if doc is not None else None
+
+    async def _load(self, user_id: str, version: int) -> Optional[Dict]:
+        try:
+            doc = await self.loader(user_id)
+        finally:
+            self._inflight.pop(user_id, None)
+        if doc is not None and version == self._version:
+            self._store(user_id, doc)
+        return doc
+
+    def _store(self, user_id: str, doc: Dict):
+        self._entries[user_id] = (self.clock() + self.ttl, doc)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str):
+        """Drop a user after it was modified"""
+        self._version += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._version += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+        }
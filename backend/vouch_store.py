@@ -0,0 +1,83 @@
+"""
+Mongo-backed store for vouches from the Discord vouches channel
+A background sync pulls only messages newer than the last seen snowflake,
+parses them once and upserts them; GET /vouches reads from the store
+"""
+import logging
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from background import Periodic
+from discord_bot import get_config, fetch_channel_messages, parse_vouch
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+
+
+class VouchStore(Periodic):
+    """
+    Vouches live in the `vouches` collection, sorted by their message snowflake
+    The sync cursor is kept in `sync_state` under _id "vouches"
+    Edits and deletions of already stored messages are not picked up
+    `stale` is set while Discord cannot be read; GET /vouches keeps serving the store
+    """
+
+    def __init__(self, db, sync_interval: float = 60.0, max_pages: int = 10):
+        self.vouches = db.vouches
+        self.sync_state = db.sync_state
+        self.sync_interval = sync_interval
+        self.max_pages = max_pages
+        self.stale = False
+        super().__init__(self.sync, sync_interval, name="vouch-sync")
+
+    async def latest(self, limit: int) -> List[Dict]:
+        """Newest vouches first, in the shape the frontend expects"""
+        cursor = self.vouches.find({}, {"_id": 0, "snowflake": 0}).sort("snowflake", -1).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def sync(self) -> int:
+        """Pull new messages from the vouches channel; returns the number of vouches stored"""
+        channel_id = get_config()['vouches_channel_id']
+        if not channel_id:
+            return 0
+
+        state = await self.sync_state.find_one({"_id": "vouches"})
+        after: Optional[str] = state.get("last_message_id") if state else None
+
+        stored = 0
+        for _ in range(self.max_pages):
+            # First sync only seeds the latest page; later syncs walk forward from the cursor
+            messages = await fetch_channel_messages(channel_id, after=after, limit=PAGE_SIZE)
+            if messages is None:
+                # Request failed or the circuit is open; retried on the next interval
+                self.stale = True
+                break
+            self.stale = False
+            if not messages:
+                break
+
+            operations = []
+            for msg in messages:
+                vouch = parse_vouch(msg)
+                if vouch:
+                    vouch["snowflake"] = int(vouch["id"])
+                    operations.append(UpdateOne({"id": vouch["id"]}, {"$set": vouch}, upsert=True))
+            if operations:
+                await self.vouches.bulk_write(operations, ordered=False)
+                stored += len(operations)
+
+            # Advance past every message seen, including skipped bot messages
+            after = str(max(int(msg["id"]) for msg in messages))
+            await self.sync_state.update_one(
+                {"_id": "vouches"},
+                {"$set": {"last_message_id": after}},
+                upsert=True
+            )
+            if state is None or len(messages) < PAGE_SIZE:
+                break
+
+        if stored:
+            logger.info(f"Synced {stored} new vouches")
+        return stored
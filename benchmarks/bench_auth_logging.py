@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: authenticated GET /api/auth/me throughput under each logging setup
+
+  previous: synchronous text handler, four INFO lines per request (token prefix included)
+  current:  queue-based JSON handler, auth success at DEBUG
+
+Users come from an in-memory loader (no Mongo); logs go to a temporary file
+
+    python benchmarks/bench_auth_logging.py [--requests 5000] [--concurrency 50]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)  # server mounts its static directory relative to cwd
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+
+import httpx  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+import server  # noqa: E402
+from log_config import setup_logging, stop_listener, TEXT_FORMAT  # noqa: E402
+
+USERS = {
+    f"user-{i}": {"id": f"user-{i}", "discord_id": str(10**17 + i), "username": f"user{i}", "role": "client"}
+    for i in range(100)
+}
+current_get_current_user = server.get_current_user
+
+
+async def load_user(user_id):
+    return USERS.get(user_id)
+
+
+async def previous_get_current_user(authorization=None):
+    """The logging pattern this replaced (same lookups, previous log lines)"""
+    logger = server.logger
+    if not authorization:
+        logger.warning("No authorization header provided")
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+    logger.info(f"Attempting to decode token: {token[:20]}...")
+    payload = server.decode_access_token(token)
+    if payload is None:
+        logger.warning("Token decode returned None")
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = payload.get("user_id")
+    logger.info(f"Looking up user with id: {user_id}")
+    user = await server.user_cache.get(user_id)
+    if user is None:
+        logger.warning(f"User not found with id: {user_id}")
+        raise HTTPException(status_code=401, detail="User not found")
+    logger.info(f"Auth successful for user: {user.get('username')}")
+    return user
+
+
+def configure(mode, log_file):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "previous":
+        handler = logging.StreamHandler(log_file)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        server.get_current_user = previous_get_current_user
+        return None
+    server.get_current_user = current_get_current_user
+    return setup_logging(level="INFO", fmt="json", stream=log_file)
+
+
+async def run(mode, total, concurrency):
+    with tempfile.TemporaryFile("w+") as log_file:
+        listener = configure(mode, log_file)
+        headers = [
+            {"Authorization": f"Bearer {server.create_access_token({'user_id': user_id})}"}
+            for user_id in USERS
+        ]
+        latencies = []
+        remaining = iter(range(total))
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench") as client:
+            async def worker():
+                for i in remaining:
+                    started = time.perf_counter()
+                    response = await client.get("/api/auth/me", headers=headers[i % len(headers)])
+                    latencies.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.text
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+        if listener is not None:
+            stop_listener(listener)
+        log_file.seek(0)
+        lines = sum(1 for _ in log_file)
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    print(f"{mode:<10}{total / elapsed:>10,.0f} req/s  p50 {p(0.50):6.2f} ms  p95 {p(0.95):6.2f} ms  "
+          f"p99 {p(0.99):6.2f} ms  {lines / total:.1f} log lines/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    server.user_cache.loader = load_user
+    # The benchmark's own client logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for mode in ("previous", "current"):
+        asyncio.run(run(mode, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /api/discord/interactions with locally signed PING payloads
+
+  verify:   signature check alone, previous per-call implementation vs InteractionVerifier
+  endpoint: interactions per second through the ASGI app (in process, no network)
+
+    python benchmarks/bench_interactions.py [--requests 5000] [--concurrency 50]
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+import timeit
+from pathlib import Path
+
+from nacl.signing import SigningKey, VerifyKey
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)  # server mounts its static directory relative to cwd
+
+SIGNING_KEY = SigningKey.generate()
+PUBLIC_KEY_HEX = SIGNING_KEY.verify_key.encode().hex()
+os.environ["DISCORD_PUBLIC_KEY"] = PUBLIC_KEY_HEX
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+
+import httpx  # noqa: E402
+from interaction_verifier import InteractionVerifier  # noqa: E402
+
+
+def signed_ping():
+    body = json.dumps({"type": 1, "id": "1", "application_id": "1", "token": "x" * 160, "version": 1}).encode()
+    timestamp = str(int(time.time()))
+    signature = SIGNING_KEY.sign(timestamp.encode() + body).signature.hex()
+    return signature, timestamp, body
+
+
+def previous_verify(signature, timestamp, body):
+    """The per-call implementation this replaced"""
+    verify_key = VerifyKey(bytes.fromhex(PUBLIC_KEY_HEX))
+    verify_key.verify(f"{timestamp}{body.decode('utf-8')}".encode(), bytes.fromhex(signature))
+    return True
+
+
+def bench_verify(number):
+    signature, timestamp, body = signed_ping()
+    verifier = InteractionVerifier(PUBLIC_KEY_HEX)
+    stale = str(int(time.time()) - 3600)
+    rows = [
+        ("previous", lambda: previous_verify(signature, timestamp, body)),
+        ("verifier", lambda: verifier.verify(signature, timestamp, body)),
+        ("stale timestamp", lambda: verifier.verify(signature, stale, body)),
+    ]
+    print(f"{'verify':<18}{'us/call':>10}")
+    for name, fn in rows:
+        per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+        print(f"{name:<18}{per_call:>10.1f}")
+
+
+async def bench_endpoint(total, concurrency):
+    import logging
+    logging.disable(logging.WARNING)
+    from server import app
+
+    requests = []
+    for _ in range(total):
+        signature, timestamp, body = signed_ping()
+        requests.append(({
+            "X-Signature-Ed25519": signature,
+            "X-Signature-Timestamp": timestamp,
+            "Content-Type": "application/json"
+        }, body))
+
+    latencies = []
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                headers, body = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post("/api/discord/interactions", content=body, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    print(f"\nendpoint: {total} PINGs, concurrency {concurrency}")
+    print(f"  {total / elapsed:,.0f} interactions/s  p50 {p(0.50):.2f} ms  p95 {p(0.95):.2f} ms  p99 {p(0.99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing in the verify benchmark")
+    args = parser.parse_args()
+
+    bench_verify(args.number)
+    asyncio.run(bench_endpoint(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the /api/metrics instrumentation per request
+
+  middleware: a minimal ASGI app called directly, with and without MetricsMiddleware
+  listener:   one Mongo command through MongoCommandMetrics (started + succeeded)
+  discord:    observe_discord for one Discord call
+  render:     GET /api/metrics body with the given number of routes
+
+    python benchmarks/bench_metrics.py [--number 50000]
+"""
+import sys
+import asyncio
+import argparse
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import metrics  # noqa: E402
+
+
+class Route:
+    path = "/api/orders/{order_id}"
+
+
+async def app(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def per_call(handler, number):
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            await handler({"type": "http", "method": "GET", "path": "/api/orders/x"}, receive, send)
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def timed(fn, number):
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=50000)
+    parser.add_argument("--routes", type=int, default=60)
+    args = parser.parse_args()
+
+    plain = asyncio.run(per_call(app, args.number))
+    wrapped = asyncio.run(per_call(metrics.MetricsMiddleware(app), args.number))
+
+    listener = metrics.MongoCommandMetrics()
+    started = SimpleNamespace(command={"find": "orders"}, command_name="find", connection_id=("db", 27017), request_id=1)
+    succeeded = SimpleNamespace(command_name="find", connection_id=("db", 27017), request_id=1, duration_micros=800)
+
+    def mongo_command():
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    def discord_call():
+        metrics.observe_discord("POST", "/channels/123456789012345678/messages", "200", 0.12)
+
+    mongo = timed(mongo_command, args.number)
+    discord = timed(discord_call, args.number)
+
+    for i in range(args.routes):
+        for status in ("200", "404"):
+            metrics.http_requests.inc("GET", f"/api/route{i}", status)
+            metrics.http_request_duration.observe(0.01, "GET", f"/api/route{i}")
+    render = timed(metrics.registry.render, 200)
+
+    print(f"{'':<22}{'us':>10}")
+    print(f"{'asgi app':<22}{plain:>10.2f}")
+    print(f"{'+ middleware':<22}{wrapped:>10.2f}")
+    print(f"{'middleware overhead':<22}{wrapped - plain:>10.2f}")
+    print(f"{'mongo command':<22}{mongo:>10.2f}")
+    print(f"{'discord call':<22}{discord:>10.2f}")
+    print(f"{'render (' + str(args.routes) + ' routes)':<22}{render:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
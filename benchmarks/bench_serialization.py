@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: response serialization for the order and user list endpoints
+
+  current: documents -> (UserResponse models) -> jsonable_encoder -> JSONResponse
+  new:     projected documents -> MongoJSONResponse (orjson)
+
+    python benchmarks/bench_serialization.py [--repeat 200]
+
+The current path is fed documents without _id; with it jsonable_encoder fails on ObjectId
+"""
+import os
+import sys
+import uuid
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)  # server mounts its static directory relative to cwd
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from server import Order, OrderStatus, UserResponse  # noqa: E402
+from responses import MongoJSONResponse  # noqa: E402
+
+SIZES = (50, 100, 1000)
+
+
+def make_orders(n):
+    now = datetime.utcnow()
+    return [
+        Order(
+            user_id=str(uuid.uuid4()),
+            discord_username=f"user{i}",
+            service_type="lord-boosting",
+            character_id="spider-man",
+            character_name="Spider-Man",
+            character_class="duelist",
+            price=19.99,
+            payment_method="paypal",
+            status=OrderStatus.in_progress,
+            progress=i % 100,
+            notes="Started on the farm",
+            created_at=now - timedelta(minutes=i)
+        ).model_dump()
+        for i in range(n)
+    ]
+
+
+def make_users(n):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "discord_id": str(100000000000000000 + i),
+            "username": f"user{i}",
+            "discriminator": "0",
+            "avatar": "a_1234567890abcdef",
+            "role": "client",
+            "created_at": now - timedelta(days=i)
+        }
+        for i in range(n)
+    ]
+
+
+def current_orders(docs):
+    return JSONResponse(jsonable_encoder(docs)).body
+
+
+def new_orders(docs):
+    return MongoJSONResponse(docs).body
+
+
+def current_users(docs):
+    users = [UserResponse(
+        id=u["id"],
+        discord_id=u["discord_id"],
+        username=u["username"],
+        discriminator=u.get("discriminator", ""),
+        avatar=u.get("avatar"),
+        role=u.get("role", "client"),
+        created_at=u.get("created_at", datetime.utcnow())
+    ) for u in docs]
+    return JSONResponse(jsonable_encoder(users)).body
+
+
+def new_users(docs):
+    return MongoJSONResponse([{"discriminator": "", "avatar": None, "role": "client", **u} for u in docs]).body
+
+
+def bench(fn, docs, repeat):
+    return min(timeit.repeat(lambda: fn(docs), number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # Sanity check: both paths produce the same JSON values
+    import json
+    sample = make_orders(3)
+    assert json.loads(current_orders(sample)) == json.loads(new_orders(sample))
+    assert json.loads(new_orders([{"_id": ObjectId(), **sample[0]}]))[0]["_id"]
+
+    print(f"{'payload':<14}{'docs':>6}{'current ms':>13}{'new ms':>10}{'speedup':>10}")
+    for name, make, current, new in (
+        ("orders", make_orders, current_orders, new_orders),
+        ("users", make_users, current_users, new_users),
+    ):
+        for size in SIZES:
+            docs = make(size)
+            before = bench(current, docs, args.repeat)
+            after = bench(new, docs, args.repeat)
+            print(f"{name:<14}{size:>6}{before:>13.3f}{after:>10.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+In-process load and latency suite for the API
+
+Drives the FastAPI app through httpx.ASGITransport (no network on the API side), with
+  - Mongo: a local mongod (--mongo-url, a throwaway database) or mongomock_motor in memory
+  - Discord: tests/fake_discord.py served by uvicorn on 127.0.0.1, with --discord-latency
+    and per-bucket rate limits (--discord-bucket-limit per --discord-window seconds)
+
+Reports throughput and p50/p95/p99 per endpoint and writes a JSON file that --compare reads back
+
+    python benchmarks/load_suite.py [--requests 1000] [--concurrency 50] [--orders 1000]
+    python benchmarks/load_suite.py --mongo-url mongodb://localhost:27017 --output results.json
+    python benchmarks/load_suite.py --compare benchmarks/results/<earlier>.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(ROOT_DIR))
+
+GUILD_ID = "900000000000000001"
+VOUCHES_CHANNEL_ID = "900000000000000002"
+ORDERS_CHANNEL_ID = "900000000000000003"
+BOOSTER_ROLE_ID = "900000000000000004"
+
+SCENARIOS = ["orders", "admin_orders", "admin_boosters", "stats", "vouches", "currency_rates", "interactions", "discord_info"]
+DEFAULT_SCENARIOS = SCENARIOS[:-1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def configure_environment(args, discord_port: int, public_key_hex: str):
+    """Everything server reads at import time"""
+    os.environ.update({
+        "DB_NAME": args.db_name,
+        "MONGO_URL": args.mongo_url or "mongodb://in-memory",
+        "DISCORD_API_URL": f"http://127.0.0.1:{discord_port}/api/v10",
+        "DISCORD_BOT_TOKEN": "bench-token",
+        "DISCORD_GUILD_ID": GUILD_ID,
+        "DISCORD_VOUCHES_CHANNEL_ID": VOUCHES_CHANNEL_ID,
+        "DISCORD_ORDERS_CHANNEL_ID": ORDERS_CHANNEL_ID,
+        "DISCORD_BOOSTER_ROLE_IDS": BOOSTER_ROLE_ID,
+        "DISCORD_PUBLIC_KEY": public_key_hex,
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+    })
+    if not args.mongo_url:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("Without --mongo-url the suite needs mongomock_motor (pip install mongomock-motor)")
+        import motor.motor_asyncio
+        # server builds its client at import; listeners are a pymongo feature the mock does not take
+        motor.motor_asyncio.AsyncIOMotorClient = lambda *a, **kw: AsyncMongoMockClient()
+    os.chdir(BACKEND_DIR)  # server mounts its static directory relative to cwd
+
+
+def fake_discord_data(args):
+    rng = random.Random(args.seed)
+    base = 1_100_000_000_000_000_000
+    vouches = [{
+        "id": str(base + i),
+        "author": {"id": str(base + 10_000 + i % 50), "username": f"customer{i % 50}", "avatar": None},
+        "content": rng.choice(["Fast and friendly, would buy again", "Rank up in one evening", "10/10"]),
+        "timestamp": (datetime(2024, 1, 1) + timedelta(hours=i)).isoformat(),
+        "mentions": [],
+        "attachments": []
+    } for i in range(args.vouches)]
+    completed = [{"id": str(base + 50_000 + i), "author": {"id": "1", "bot": True}, "content": "Order completed"}
+                 for i in range(args.completed_messages)]
+    members = [{"user": {"id": str(base + 20_000 + i), "username": f"member{i}"},
+                "roles": [BOOSTER_ROLE_ID] if i < args.boosters else []}
+               for i in range(args.members)]
+    return {VOUCHES_CHANNEL_ID: vouches, ORDERS_CHANNEL_ID: completed}, members
+
+
+async def seed(server, args):
+    """Users (clients, boosters, one admin) and orders spread over them"""
+    rng = random.Random(args.seed)
+    db = server.db
+    now = datetime.utcnow()
+    base = 1_100_000_000_000_000_000
+    users = [{
+        "id": "bench-admin", "discord_id": str(base + 30_000), "username": "admin", "discriminator": "0",
+        "avatar": None, "role": "admin", "created_at": now
+    }]
+    for i in range(args.boosters):
+        users.append({"id": f"bench-booster-{i}", "discord_id": str(base + 20_000 + i), "username": f"booster{i}",
+                      "discriminator": "0", "avatar": None, "role": "booster", "created_at": now})
+    for i in range(args.clients):
+        users.append({"id": f"bench-client-{i}", "discord_id": str(base + 40_000 + i), "username": f"client{i}",
+                      "discriminator": "0", "avatar": None, "role": "client", "created_at": now})
+    await db.users.insert_many(users)
+
+    clients = [u for u in users if u["role"] == "client"]
+    boosters = [u for u in users if u["role"] == "booster"]
+    characters = [(character_class, c) for character_class, group in server.CHARACTERS.items() for c in group]
+    services = list(server.SERVICE_TYPES)
+    orders = []
+    for i in range(args.orders):
+        customer = clients[i % len(clients)]
+        character_class, character = rng.choice(characters)
+        service = rng.choice(services)
+        status = rng.choice(["pending", "in_progress", "completed", "completed"])
+        booster = rng.choice(boosters) if boosters and status in ("in_progress", "completed") else None
+        created = now - timedelta(minutes=args.orders - i)
+        orders.append(server.Order(
+            user_id=customer["id"],
+            discord_username=customer["username"],
+            service_type=service["id"],
+            character_id=character["id"],
+            character_name=character["name"],
+            character_class=character_class,
+            price=server.price_matrix.usd_price(character["id"], service["id"]) or 10.0,
+            payment_method="paypal",
+            status=status,
+            booster_id=booster["id"] if booster else None,
+            booster_username=booster["username"] if booster else None,
+            # Historic orders already have their ticket; pending ones would be picked up by outbox recovery
+            ticket_status="created",
+            created_at=created,
+            updated_at=created
+        ).model_dump())
+    for start in range(0, len(orders), 1000):
+        await db.orders.insert_many(orders[start:start + 1000])
+    return users
+
+
+def build_requests(server, users, signing_key, total):
+    """(method, path, headers, body) per request; PING signatures are made before the timed loop"""
+    token = lambda user_id: {"Authorization": f"Bearer {server.create_access_token({'user_id': user_id})}"}  # noqa: E731
+    admin = token("bench-admin")
+    clients = [token(u["id"]) for u in users if u["role"] == "client"]
+
+    def interactions():
+        body = json.dumps({"type": 1, "id": "1", "application_id": "1", "token": "x" * 160, "version": 1}).encode()
+        items = []
+        for _ in range(total):
+            timestamp = str(int(time.time()))
+            signature = signing_key.sign(timestamp.encode() + body).signature.hex()
+            items.append(("POST", "/api/discord/interactions", {
+                "X-Signature-Ed25519": signature,
+                "X-Signature-Timestamp": timestamp,
+                "Content-Type": "application/json"
+            }, body))
+        return items
+
+    return {
+        "orders": lambda: [("GET", "/api/orders", clients[i % len(clients)], None) for i in range(total)],
+        "admin_orders": lambda: [("GET", "/api/admin/orders", admin, None)] * total,
+        "admin_boosters": lambda: [("GET", "/api/admin/boosters", admin, None)] * total,
+        "stats": lambda: [("GET", "/api/stats", {}, None)] * total,
+        "vouches": lambda: [("GET", "/api/vouches", {}, None)] * total,
+        "currency_rates": lambda: [("GET", "/api/currency/rates", {"Accept-Encoding": "gzip"}, None)] * total,
+        "interactions": interactions,
+        "discord_info": lambda: [("GET", "/api/discord/info", {}, None)] * total,
+    }
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_scenario(client, requests, concurrency):
+    latencies = []
+    statuses = Counter()
+    remaining = iter(requests)
+
+    async def worker():
+        for method, path, headers, body in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, content=body)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": dict(statuses),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+async def run_suite(args):
+    import uvicorn
+    import httpx
+    from nacl.signing import SigningKey
+
+    started_at = datetime.utcnow().isoformat()
+    signing_key = SigningKey.generate()
+    discord_port = free_port()
+    configure_environment(args, discord_port, signing_key.verify_key.encode().hex())
+
+    from tests.fake_discord import FakeDiscord
+    import server
+
+    messages, members = fake_discord_data(args)
+    fake = FakeDiscord(
+        bucket_limit=args.discord_bucket_limit,
+        window=args.discord_window,
+        latency=args.discord_latency,
+        messages=messages,
+        members=members
+    )
+    discord_server = uvicorn.Server(uvicorn.Config(
+        fake.app, host="127.0.0.1", port=discord_port, log_level="error", lifespan="off"
+    ))
+    discord_task = asyncio.create_task(discord_server.serve())
+    while not discord_server.started:
+        await asyncio.sleep(0.01)
+
+    # Exchange rates come from a canned response instead of the public API
+    server.currency_rates.transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"rates": dict(server.currency_rates.rates)})
+    )
+
+    results = {}
+    try:
+        if args.mongo_url:
+            await server.client.drop_database(args.db_name)
+        users = await seed(server, args)
+        await server.startup_event()
+        # Let the startup syncs (vouches, members, stats snapshot) land before measuring
+        await asyncio.sleep(args.settle)
+
+        builders = build_requests(server, users, signing_key, args.requests + args.warmup)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            for name in args.scenarios:
+                requests = builders[name]()
+                if args.warmup:
+                    await run_scenario(client, requests[:args.warmup], args.concurrency)
+                results[name] = await run_scenario(client, requests[args.warmup:], args.concurrency)
+                print(format_row(name, results[name]), flush=True)
+    finally:
+        if args.mongo_url:
+            await server.client.drop_database(args.db_name)
+        await server.shutdown_db_client()
+        discord_server.should_exit = True
+        await discord_task
+
+    return {
+        "meta": {
+            "started_at": started_at,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo": "mongod" if args.mongo_url else "mongomock",
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "orders": args.orders,
+            "clients": args.clients,
+            "boosters": args.boosters,
+            "vouches": args.vouches,
+            "discord_latency": args.discord_latency,
+            "discord_bucket_limit": args.discord_bucket_limit,
+            "discord_window": args.discord_window,
+            "discord_requests": dict(fake.requests),
+            "discord_rate_limited": fake.rate_limited,
+        },
+        "results": results
+    }
+
+
+def format_row(name, row):
+    errors = f"  errors {row['errors']} {row['statuses']}" if row["errors"] else ""
+    return (f"{name:<16}{row['throughput']:>10,.0f} req/s  p50 {row['p50_ms']:8.2f} ms  "
+            f"p95 {row['p95_ms']:8.2f} ms  p99 {row['p99_ms']:8.2f} ms{errors}")
+
+
+def compare(baseline, current):
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')})")
+    print(f"{'':<16}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, row in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        delta = lambda key: (row[key] - before[key]) / before[key] * 100 if before[key] else 0.0  # noqa: E731
+        print(f"{name:<16}{delta('throughput'):>+9.1f}%{delta('p50_ms'):>+9.1f}%"
+              f"{delta('p95_ms'):>+9.1f}%{delta('p99_ms'):>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--requests", type=int, default=1000, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mongo-url", help="local mongod; a throwaway database is created and dropped")
+    parser.add_argument("--db-name", default="trs_bench")
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--boosters", type=int, default=20)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--vouches", type=int, default=200)
+    parser.add_argument("--completed-messages", type=int, default=300)
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="seconds added to every fake Discord response")
+    parser.add_argument("--discord-bucket-limit", type=int, default=50)
+    parser.add_argument("--discord-window", type=float, default=1.0)
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to wait after startup")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+    # The suite runs from backend/; resolve user paths first
+    args.output = args.output and Path(args.output).resolve()
+    args.compare = args.compare and Path(args.compare).resolve()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(run_suite(args))
+
+    output = args.output or RESULTS_DIR / f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -124,7 +124,8 @@ const AdminDashboard = () => {
       booster_id: order.booster_id || '',
       notes: order.notes || '',
       progress: order.progress || 0,
-      eta: order.eta || ''
+      eta: order.eta || '',
+      version: order.version
     });
     setEditDialogOpen(true);
   };
@@ -146,7 +147,11 @@ const AdminDashboard = () => {
       toast.success('Order updated successfully!');
     } catch (error) {
       console.error('Failed to update order:', error);
-      toast.error('Failed to update order');
+      if (error.response?.status === 409) {
+        toast.error('This order was changed by someone else. Reload and try again.');
+      } else {
+        toast.error('Failed to update order');
+      }
     }
   };
 
@@ -55,9 +55,55 @@ const DashboardPage = () => {
       }
     };
 
-    if (isAuthenticated && token) {
-      fetchOrders();
-    }
+    if (!isAuthenticated || !token) return;
+
+    fetchOrders();
+
+    // Live order updates. EventSource cannot send headers, so the URL carries a
+    // short-lived stream token rather than the session token. The browser reconnects
+    // on its own and resumes from the last event; once the stream token has expired
+    // the reconnect is refused, and a new token is minted and the list reloaded
+    let events = null;
+    let closed = false;
+
+    const openStream = async () => {
+      if (closed) return;
+      let stream;
+      try {
+        const response = await axios.post(`${API}/orders/stream-token`, null, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        if (closed) return;
+        stream = new EventSource(`${API}/orders/stream?token=${encodeURIComponent(response.data.token)}`);
+      } catch (error) {
+        console.error('Failed to open order stream:', error);
+        return;
+      }
+      events = stream;
+      stream.addEventListener('order', (event) => {
+        const order = JSON.parse(event.data);
+        setOrders(prev => {
+          const exists = prev.some(o => o.id === order.id);
+          return exists
+            ? prev.map(o => (o.id === order.id ? { ...o, ...order } : o))
+            : [order, ...prev];
+        });
+      });
+      // The server could not replay what was missed: load the list again
+      stream.addEventListener('reset', fetchOrders);
+      stream.addEventListener('error', () => {
+        if (closed || stream.readyState !== EventSource.CLOSED) return;
+        fetchOrders();
+        setTimeout(openStream, 1000);
+      });
+    };
+
+    openStream();
+
+    return () => {
+      closed = true;
+      if (events) events.close();
+    };
   }, [isAuthenticated, token]);
 
   const filteredOrders = activeTab === 'all' 
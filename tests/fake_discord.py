@@ -0,0 +1,144 @@
+"""
+Local fake of the Discord REST API for tests and benchmarks
+Serves the endpoints discord_bot uses and returns real X-RateLimit-* headers
+"""
+import time
+import asyncio
+import itertools
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from discord_ratelimit import route_key, major_parameters
+
+API_PREFIX = "/api/v10"
+
+
+class FakeDiscord:
+    """
+    Starlette app that mimics discord.com/api/v10
+    Every bucket allows `bucket_limit` requests per `window` seconds
+    """
+
+    def __init__(
+        self,
+        bucket_limit: int = 5,
+        window: float = 1.0,
+        latency: float = 0.0,
+        global_rate_limits: int = 0,
+        messages: Optional[Dict[str, List[Dict]]] = None,
+        members: Optional[List[Dict]] = None
+    ):
+        self.bucket_limit = bucket_limit
+        self.window = window
+        self.latency = latency
+        # Number of upcoming requests answered with a global 429
+        self.global_rate_limits = global_rate_limits
+        self.messages = messages or {}
+        self.members = members or []
+        self.ids = itertools.count(1000)
+        self.windows: Dict[str, Tuple[float, int]] = {}
+        self.requests = Counter()
+        self.rate_limited = 0
+        self.app = Starlette(routes=[
+            Route(API_PREFIX + "/{path:path}", self.handle, methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
+        ])
+
+    def _bucket(self, method: str, path: str) -> str:
+        # Like Discord, one bucket hash per route, shared across major parameters
+        route = route_key(method, path, keep_major=False)
+        return f"{route}|{major_parameters(path)}"
+
+    def _rate_limit(self, bucket: str) -> Tuple[Optional[Response], Dict[str, str]]:
+        now = time.monotonic()
+        reset_at, count = self.windows.get(bucket, (0.0, 0))
+        if now >= reset_at:
+            reset_at, count = now + self.window, 0
+
+        if self.global_rate_limits > 0:
+            self.global_rate_limits -= 1
+            self.rate_limited += 1
+            headers = {"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global", "Retry-After": str(self.window)}
+            return JSONResponse(
+                {"message": "You are being rate limited.", "retry_after": self.window, "global": True},
+                status_code=429,
+                headers=headers
+            ), headers
+
+        headers = {
+            "X-RateLimit-Limit": str(self.bucket_limit),
+            "X-RateLimit-Bucket": str(abs(hash(bucket.split("|")[0])) % 10 ** 8),
+            "X-RateLimit-Reset-After": f"{reset_at - now:.3f}"
+        }
+        if count >= self.bucket_limit:
+            self.rate_limited += 1
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["X-RateLimit-Scope"] = "user"
+            return JSONResponse(
+                {"message": "You are being rate limited.", "retry_after": round(reset_at - now, 3), "global": False},
+                status_code=429,
+                headers=headers
+            ), headers
+
+        self.windows[bucket] = (reset_at, count + 1)
+        headers["X-RateLimit-Remaining"] = str(self.bucket_limit - count - 1)
+        return None, headers
+
+    async def handle(self, request: Request) -> Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        path = "/" + request.path_params["path"]
+        method = request.method
+        self.requests[route_key(method, path)] += 1
+
+        limited, headers = self._rate_limit(self._bucket(method, path))
+        if limited is not None:
+            return limited
+
+        parts = path.strip("/").split("/")
+        if method == "GET" and parts[0] == "guilds" and len(parts) == 2:
+            return JSONResponse({
+                "id": parts[1],
+                "name": "Fake Guild",
+                "icon": None,
+                "approximate_member_count": len(self.members),
+                "approximate_presence_count": len(self.members) // 2
+            }, headers=headers)
+        if method == "GET" and parts[0] == "guilds" and parts[-1] == "members":
+            after = int(request.query_params.get("after", 0))
+            limit = int(request.query_params.get("limit", 1))
+            page = [m for m in self.members if int(m["user"]["id"]) > after][:limit]
+            return JSONResponse(page, headers=headers)
+        if method == "POST" and parts[0] == "guilds" and parts[-1] == "channels":
+            body = await request.json()
+            return JSONResponse({"id": str(next(self.ids)), "name": body.get("name")}, status_code=201, headers=headers)
+        if method == "GET" and parts[0] == "channels" and parts[-1] == "messages":
+            return JSONResponse(self._page_messages(parts[1], request.query_params), headers=headers)
+        if method == "POST" and parts[-1] == "messages":
+            return JSONResponse({"id": str(next(self.ids))}, headers=headers)
+        if method == "DELETE" and parts[0] == "channels":
+            return JSONResponse({"id": parts[1]}, headers=headers)
+        if method == "GET" and path == "/oauth2/applications/@me":
+            return JSONResponse({"id": "1"}, headers=headers)
+        if parts[-1] == "commands":
+            if method == "PUT":
+                return JSONResponse(await request.json(), headers=headers)
+            return JSONResponse({"id": str(next(self.ids))}, status_code=201, headers=headers)
+        return JSONResponse({"id": str(next(self.ids))}, headers=headers)
+
+    def _page_messages(self, channel_id: str, params) -> List[Dict]:
+        # Messages are stored oldest first; Discord returns newest first
+        messages = self.messages.get(channel_id, [])
+        limit = int(params.get("limit", 50))
+        if "after" in params:
+            after = int(params["after"])
+            page = [m for m in messages if int(m["id"]) > after][:limit]
+        else:
+            before = int(params["before"]) if "before" in params else None
+            page = [m for m in messages if before is None or int(m["id"]) < before][-limit:]
+        return list(reversed(page))
@@ -0,0 +1,28 @@
+import asyncio
+
+import booster_index
+from booster_index import BoosterIndex
+
+
+def test_sweep_keeps_members_applied_while_paging(monkeypatch):
+    index = BoosterIndex(["booster"])
+    index.members["gone"] = {"id": "gone", "username": "gone", "roles": ["booster"]}
+
+    async def fetch_page(guild_id, after, limit):
+        if after != "0":
+            return []
+        # Interactions arrive while the sweep is waiting on Discord
+        index.apply_member({"user": {"id": "2"}, "roles": ["booster"]})
+        index.apply_member({"user": {"id": "1"}, "roles": []})
+        return [
+            {"user": {"id": "1"}, "roles": ["booster"]},
+            {"user": {"id": "2"}, "roles": []},
+            {"user": {"id": "3"}, "roles": ["booster"]}
+        ]
+
+    monkeypatch.setattr(booster_index, "fetch_guild_members_page", fetch_page)
+    monkeypatch.setattr(booster_index, "get_config", lambda: {"guild_id": "1"})
+
+    assert asyncio.run(index.sweep())
+    assert sorted(index.members) == ["2", "3"]
+    assert index.ready
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from discord_client import DiscordClient
+from tests.fake_discord import FakeDiscord
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("GET /guilds/:id", failure_threshold=3, reset_timeout=30, clock=Clock())
+    breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_lets_one_probe_through():
+    clock = Clock()
+    breaker = CircuitBreaker("GET /guilds/:id", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_cancelled_probe_does_not_block_the_next():
+    clock = Clock()
+    breaker = CircuitBreaker("GET /guilds/:id", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_rate_limit_queue_timeouts_are_not_failures():
+    fake = FakeDiscord(bucket_limit=5, window=1.0)
+    client = DiscordClient(
+        "test-token",
+        base_url="http://fake-discord/api/v10",
+        breaker_failures=5,
+        transport=httpx.ASGITransport(app=fake.app)
+    )
+
+    async def run():
+        results = await asyncio.gather(
+            *[client.get("/guilds/123456789012345678", deadline=0.3) for _ in range(40)],
+            return_exceptions=True
+        )
+        await client.aclose()
+        return results
+
+    results = asyncio.run(run())
+    assert sum(isinstance(r, httpx.Response) for r in results) == 5
+    assert all(isinstance(r, (httpx.Response, asyncio.TimeoutError)) for r in results)
+    assert client.breakers.get("GET /guilds/:id").stats()["failures"] == 0
+
+
+def test_server_errors_open_the_circuit():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = DiscordClient(
+        "test-token",
+        base_url="http://fake-discord/api/v10",
+        breaker_failures=3,
+        transport=httpx.MockTransport(handler)
+    )
+
+    async def run():
+        for _ in range(3):
+            assert (await client.get("/guilds/123456789012345678", deadline=1.0)).status_code == 503
+        with pytest.raises(CircuitOpenError):
+            await client.get("/guilds/123456789012345678", deadline=1.0)
+        await client.aclose()
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert client.breakers.get("GET /guilds/:id").state == OPEN
@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+
+from discord_client import DiscordClient
+from discord_ratelimit import RateLimiter, route_key, major_parameters, token_digest
+from tests.fake_discord import FakeDiscord
+
+
+def make_client(fake: FakeDiscord, max_retries: int = 3) -> DiscordClient:
+    return DiscordClient(
+        "test-token",
+        base_url="http://fake-discord/api/v10",
+        max_retries=max_retries,
+        transport=httpx.ASGITransport(app=fake.app)
+    )
+
+
+def test_route_key_keeps_major_parameters():
+    assert route_key("get", "/channels/123/messages/456") == "GET /channels/123/messages/:id"
+    assert route_key("GET", "/guilds/9/members?limit=1000") == "GET /guilds/9/members"
+    assert route_key("GET", "/channels/123/messages", keep_major=False) == "GET /channels/:id/messages"
+    assert major_parameters("/channels/123/messages") == "channels/123"
+    assert major_parameters("/oauth2/applications/@me") == ""
+
+
+def test_requests_queue_on_exhausted_bucket():
+    # With latency, requests are still in flight when the next waiter takes the bucket
+    fake = FakeDiscord(bucket_limit=2, window=0.2, latency=0.01)
+    client = make_client(fake)
+
+    async def run():
+        responses = await asyncio.gather(*[client.get("/channels/1/messages") for _ in range(6)])
+        await client.aclose()
+        return responses
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200] * 6
+    # Limits are learnt from the first response, so nothing ever hits a 429
+    assert fake.rate_limited == 0
+    stats = client.stats()
+    assert stats["total_wait"] > 0
+    assert stats["queued"] == 0
+
+
+def test_retry_after_is_honored_on_429():
+    fake = FakeDiscord(bucket_limit=1, window=0.1)
+    client = make_client(fake, max_retries=5)
+
+    async def run():
+        # Fill the window from outside the client so the next call gets a 429
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url="http://fake-discord") as raw:
+            await raw.get("/api/v10/guilds/1")
+        response = await client.get("/guilds/1")
+        await client.aclose()
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert fake.rate_limited == 1
+    bucket_stats = list(client.stats()["buckets"].values())
+    assert sum(b["rate_limited"] for b in bucket_stats) == 1
+
+
+def test_global_rate_limit_blocks_all_buckets():
+    fake = FakeDiscord(bucket_limit=50, window=0.1, global_rate_limits=1)
+    client = make_client(fake)
+
+    async def run():
+        first = await client.get("/guilds/1")
+        second = await client.get("/channels/2/messages")
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.status_code == 200 and second.status_code == 200
+    assert client.stats()["global_rate_limited"] == 1
+
+
+def test_gives_up_after_max_retries():
+    fake = FakeDiscord(bucket_limit=50, window=0.01, global_rate_limits=10)
+    client = make_client(fake, max_retries=1)
+
+    async def run():
+        response = await client.get("/guilds/1")
+        await client.aclose()
+        return response
+
+    assert asyncio.run(run()).status_code == 429
+
+
+def test_webhook_tokens_stay_out_of_keys_and_stats():
+    fake = FakeDiscord(bucket_limit=50)
+    client = make_client(fake)
+    token = "aW50ZXJhY3Rpb246c2VjcmV0"
+
+    async def run():
+        await client.post(f"/webhooks/1/{token}/messages/@original", json={"content": "hi"})
+        await client.aclose()
+
+    asyncio.run(run())
+    assert route_key("POST", f"/webhooks/1/{token}") == f"POST /webhooks/1/{token_digest(token)}"
+    assert route_key("POST", f"/webhooks/1/{token}", keep_major=False) == "POST /webhooks/:id/:token"
+    assert token not in str(client.stats())
+    assert token not in str(client.ratelimiter.route_buckets)
+
+
+def test_idle_buckets_are_pruned():
+    fake = FakeDiscord(bucket_limit=50, window=0.05)
+    client = make_client(fake)
+    client.ratelimiter.prune_interval = 0
+
+    async def run():
+        for channel in range(20):
+            await client.post(f"/channels/{channel}/messages", json={"content": "hi"})
+        await asyncio.sleep(0.1)
+        await client.get("/guilds/1")
+        await client.aclose()
+
+    asyncio.run(run())
+    # Only the buckets of the last request (provisional route + learnt hash) are left
+    assert all(key.endswith("guilds/1") for key in client.ratelimiter.buckets)
+    assert len(client.ratelimiter.route_buckets) == 2
+
+
+def test_route_without_headers_is_probed_once():
+    in_flight = 0
+    peak = 0
+
+    async def send():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    limiter = RateLimiter()
+
+    async def run():
+        await asyncio.gather(*[limiter.send("GET", "/gateway/bot", send) for _ in range(10)])
+
+    asyncio.run(run())
+    # The first request holds the bucket; the rest are not serialized behind each other
+    assert peak == 9
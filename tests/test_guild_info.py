@@ -0,0 +1,34 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+import guild_info
+from guild_info import GuildInfoSnapshot
+from last_good import LastKnownGood
+
+INFO = {"name": "Guild", "icon": None, "member_count": 120, "online_count": 40}
+
+
+def test_failed_refresh_serves_the_last_good_copy(monkeypatch):
+    db = AsyncMongoMockClient()["test"]
+    replies = [INFO, None]
+
+    async def get_guild_info():
+        return replies.pop(0)
+
+    monkeypatch.setattr(guild_info, "get_guild_info", get_guild_info)
+    snapshot = GuildInfoSnapshot(store=LastKnownGood(db, "discord_info"))
+
+    assert snapshot.to_dict()["stale"]
+    assert asyncio.run(snapshot.refresh())
+    assert snapshot.to_dict() == {**INFO, "stale": False}
+
+    assert not asyncio.run(snapshot.refresh())
+    served = snapshot.to_dict()
+    assert served["stale"] and served["member_count"] == 120 and "updated_at" in served
+
+    # A new process that cannot reach Discord starts from the persisted copy
+    monkeypatch.setattr(guild_info, "get_guild_info", lambda: asyncio.sleep(0))
+    restarted = GuildInfoSnapshot(store=LastKnownGood(db, "discord_info"))
+    assert not asyncio.run(restarted.refresh())
+    assert restarted.to_dict()["member_count"] == 120
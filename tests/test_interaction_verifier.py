@@ -0,0 +1,44 @@
+from nacl.signing import SigningKey
+
+from interaction_verifier import InteractionVerifier
+
+NOW = 1_700_000_000
+
+
+def make_verifier():
+    signing_key = SigningKey.generate()
+    verifier = InteractionVerifier(signing_key.verify_key.encode().hex(), max_age=300, clock=lambda: NOW)
+    return signing_key, verifier
+
+
+def sign(signing_key, timestamp, body):
+    return signing_key.sign(timestamp.encode() + body).signature.hex()
+
+
+def test_accepts_signed_body():
+    signing_key, verifier = make_verifier()
+    body = b'{"type":1}'
+    timestamp = str(NOW)
+    assert verifier.verify(sign(signing_key, timestamp, body), timestamp, body)
+
+
+def test_rejects_tampered_body_and_bad_signature():
+    signing_key, verifier = make_verifier()
+    timestamp = str(NOW)
+    signature = sign(signing_key, timestamp, b'{"type":1}')
+    assert not verifier.verify(signature, timestamp, b'{"type":2}')
+    assert not verifier.verify("zz" * 64, timestamp, b'{"type":1}')
+    assert not verifier.verify(signature[:-2], timestamp, b'{"type":1}')
+
+
+def test_rejects_stale_or_malformed_timestamp():
+    signing_key, verifier = make_verifier()
+    body = b'{"type":1}'
+    stale = str(NOW - 301)
+    assert not verifier.verify(sign(signing_key, stale, body), stale, body)
+    assert not verifier.verify(sign(signing_key, "soon", body), "soon", body)
+
+
+def test_invalid_public_key_rejects_everything():
+    verifier = InteractionVerifier("not-hex")
+    assert not verifier.verify("00" * 64, str(NOW), b"{}")
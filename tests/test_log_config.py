@@ -0,0 +1,46 @@
+import io
+import asyncio
+import logging
+
+import httpx
+
+import discord_bot
+from discord_client import DiscordClient
+from log_config import setup_logging, stop_listener
+
+TOKEN = "aW50ZXJhY3Rpb246MTIzNDU2Nzg5MDEyMzQ1Njc4OnNlY3JldA"
+
+
+def test_interaction_tokens_stay_out_of_the_logs(monkeypatch):
+    client = DiscordClient(
+        "test-token",
+        base_url="http://fake-discord/api/v10",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+    )
+    monkeypatch.setattr(discord_bot, "discord_client", client)
+
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    output = io.StringIO()
+    listener = setup_logging(level="DEBUG", stream=output)
+    try:
+        interaction = {"application_id": "123456789012345678", "token": TOKEN}
+
+        async def run():
+            assert await discord_bot.send_interaction_followup(interaction, "done")
+            assert await discord_bot.send_interaction_followup(interaction, "done", edit_original=False)
+            await client.aclose()
+
+        asyncio.run(run())
+        logging.getLogger("discord_bot").info("follow-ups sent")
+    finally:
+        stop_listener(listener)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    logged = output.getvalue()
+    assert "follow-ups sent" in logged
+    assert TOKEN not in logged
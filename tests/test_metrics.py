@@ -0,0 +1,38 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from metrics import MetricsMiddleware, http_request_duration, http_requests
+
+
+app = FastAPI()
+
+
+@app.get("/metrics-test/plain")
+async def plain():
+    return {}
+
+
+@app.get("/metrics-test/stream")
+async def stream():
+    async def events():
+        yield "data: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def test_event_streams_are_counted_but_not_timed():
+    async def run():
+        transport = httpx.ASGITransport(app=MetricsMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/metrics-test/plain")
+            await client.get("/metrics-test/stream")
+
+    asyncio.run(run())
+    timed = "\n".join(http_request_duration.render())
+    counted = "\n".join(http_requests.render())
+    assert 'route="/metrics-test/plain"' in timed
+    assert 'route="/metrics-test/stream"' not in timed
+    assert 'route="/metrics-test/stream",status="200"} 1' in counted
@@ -0,0 +1,124 @@
+import os
+import json
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.conftest import BACKEND_DIR
+
+
+@pytest.fixture(scope="module")
+def server():
+    """backend/server.py on an in-memory Mongo"""
+    import motor.motor_asyncio
+
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "test")
+    original, cwd = motor.motor_asyncio.AsyncIOMotorClient, os.getcwd()
+    motor.motor_asyncio.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+    # The app mounts backend/static relative to the working directory
+    os.chdir(BACKEND_DIR)
+    try:
+        import server
+    finally:
+        motor.motor_asyncio.AsyncIOMotorClient = original
+        os.chdir(cwd)
+    return server
+
+
+@pytest.fixture
+def app(server, monkeypatch):
+    async def admin(authorization=None):
+        return {"id": "admin", "username": "admin", "role": "admin"}
+
+    monkeypatch.setattr(server, "get_current_user", admin)
+    asyncio.run(server.db.orders.delete_many({}))
+    asyncio.run(server.db.counters.delete_many({}))
+    return server
+
+
+def insert_order(server, order_id, status="pending", version=1):
+    order = server.Order(
+        id=order_id, user_id="u1", discord_username="rival", service_type="rank_boost",
+        character_id="hela", character_name="Hela", character_class="Duelist",
+        price=25.0, payment_method="paypal", status=status, version=version
+    )
+    asyncio.run(server.db.orders.insert_one(order.model_dump()))
+
+
+def test_patch_with_stale_version_is_a_conflict(app):
+    insert_order(app, "o1", version=3)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(app.update_order("o1", app.OrderUpdate(progress=50, version=2)))
+    assert error.value.status_code == 409
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(app.update_order("missing", app.OrderUpdate(progress=50, version=2)))
+    assert error.value.status_code == 404
+
+    asyncio.run(app.update_order("o1", app.OrderUpdate(progress=50, version=3)))
+    order = asyncio.run(app.db.orders.find_one({"id": "o1"}))
+    assert (order["progress"], order["version"]) == (50, 4)
+
+
+def test_bulk_update_reports_each_item(app):
+    insert_order(app, "ok", version=1)
+    insert_order(app, "stale", version=5)
+
+    response = asyncio.run(app.bulk_update_orders(app.OrderBulkRequest(updates=[
+        app.OrderBulkUpdate(id="ok", progress=10, version=1),
+        app.OrderBulkUpdate(id="missing", progress=10),
+        app.OrderBulkUpdate(id="stale", progress=10, version=4)
+    ])))
+    body = json.loads(response.body)
+
+    assert (body["updated"], body["failed"]) == (1, 2)
+    results = {r["id"]: r for r in body["results"]}
+    assert results["ok"]["success"] and results["ok"]["order"]["version"] == 2
+    assert results["missing"]["error"] == "not_found"
+    assert results["stale"] == {"id": "stale", "success": False, "error": "conflict", "version": 5}
+    stale = asyncio.run(app.db.orders.find_one({"id": "stale"}))
+    assert (stale["progress"], stale["version"]) == (0, 5)
+
+
+def test_completed_counter_follows_the_net_delta(app):
+    for order_id in ("a", "b", "c"):
+        insert_order(app, order_id)
+    insert_order(app, "done", status="completed")
+
+    asyncio.run(app.bulk_update_orders(app.OrderBulkRequest(updates=[
+        app.OrderBulkUpdate(id="a", status="completed"),
+        app.OrderBulkUpdate(id="b", status="completed"),
+        app.OrderBulkUpdate(id="c", status="in_progress"),
+        app.OrderBulkUpdate(id="done", status="in_progress")
+    ])))
+    assert asyncio.run(app.completed_orders.get()) == 1
+
+    # Re-sending the same status is not a transition
+    asyncio.run(app.update_order("a", app.OrderUpdate(status="completed")))
+    assert asyncio.run(app.completed_orders.get()) == 1
+    asyncio.run(app.update_order("a", app.OrderUpdate(status="in_progress")))
+    assert asyncio.run(app.completed_orders.get()) == 0
+
+
+def test_order_stream_only_takes_stream_tokens_in_the_url(server):
+    asyncio.run(server.db.users.update_one({"id": "u1"}, {"$set": {"id": "u1", "username": "rival"}}, upsert=True))
+    session_token = server.create_access_token({"user_id": "u1"})
+    stream_token = asyncio.run(server.create_order_stream_token(f"Bearer {session_token}"))["token"]
+
+    async def open_stream(token):
+        response = await server.stream_my_orders(Request({"type": "http", "headers": []}), token=token, authorization=None)
+        return response.media_type
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(open_stream(session_token))
+    assert error.value.status_code == 401
+    assert asyncio.run(open_stream(stream_token)) == "text/event-stream"
+
+    # ...and a stream token is not a session token
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.get_current_user(f"Bearer {stream_token}"))
+    assert error.value.status_code == 401
@@ -0,0 +1,34 @@
+import asyncio
+
+from guild_info import GuildInfoSnapshot
+from stats_snapshot import StatsSnapshot
+
+
+class Boosters:
+    ready = True
+
+    def count(self):
+        return 7
+
+
+class CompletedOrders:
+    async def get(self):
+        return 42
+
+
+def test_member_count_comes_from_the_guild_info_copy():
+    guild_info = GuildInfoSnapshot()
+    snapshot = StatsSnapshot(Boosters(), CompletedOrders(), guild_info)
+
+    # No guild info yet: the other parts refresh, the snapshot stays stale
+    assert not asyncio.run(snapshot.refresh())
+    assert snapshot.stale and snapshot.orders_completed == 42 and snapshot.active_boosters == 7
+
+    guild_info.info, guild_info.stale = {"name": "Guild", "member_count": 120}, False
+    assert asyncio.run(snapshot.refresh())
+    assert snapshot.to_dict()["server_members"] == 120 and not snapshot.stale
+
+    # A stale copy is not a fresh member count, but the last good value is kept
+    guild_info.stale = True
+    assert not asyncio.run(snapshot.refresh())
+    assert snapshot.server_members == 120 and snapshot.stale
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from ticket_outbox import TicketOutbox
+
+
+def test_recover_enqueues_orders_without_a_job():
+    db = AsyncMongoMockClient()["test"]
+    outbox = TicketOutbox(db, create_ticket=None, recover_after=60)
+
+    async def run():
+        await db.users.insert_one({"id": "u1", "discord_id": "42"})
+        old, recent = datetime.utcnow() - timedelta(minutes=5), datetime.utcnow()
+        for order_id, created_at in (("has-job", old), ("orphan", old), ("just-placed", recent)):
+            await db.orders.insert_one({
+                "id": order_id, "user_id": "u1", "discord_username": "rival", "character_name": "Hela",
+                "service_type": "rank_boost", "price": 25.0, "ticket_status": "pending", "created_at": created_at
+            })
+        await outbox.enqueue("has-job", {"discord_id": "42"})
+        recovered = await outbox.recover(), await outbox.recover()
+        return recovered, await db.ticket_outbox.find({}, {"_id": 0}).to_list(None)
+
+    recovered, jobs = asyncio.run(run())
+    assert recovered == (1, 0)
+    assert sorted(job["order_id"] for job in jobs) == ["has-job", "orphan"]
+    orphan = next(job for job in jobs if job["order_id"] == "orphan")
+    assert orphan["payload"]["discord_id"] == "42" and orphan["status"] == "pending"
+
+
+def test_retries_reuse_the_channel_an_earlier_attempt_created():
+    db = AsyncMongoMockClient()["test"]
+    created = []
+    attempts = []
+
+    async def create_ticket(order_id, channel, on_created, find_existing, deadline, **payload):
+        assert deadline < outbox.lease_seconds
+        attempts.append(channel)
+        if channel is None:
+            channel = {"channel_id": f"c{len(created)}", "channel_name": f"ticket-{order_id}"}
+            created.append(channel)
+            await on_created(channel)
+        if len(attempts) == 1:
+            raise RuntimeError("welcome message timed out")
+        return channel
+
+    outbox = TicketOutbox(db, create_ticket=create_ticket, base_delay=0)
+
+    async def run():
+        await db.orders.insert_one({"id": "o1", "ticket_status": "pending"})
+        await outbox.enqueue("o1", {})
+        await outbox._process(await outbox._claim())
+        await outbox._process(await outbox._claim())
+        return await db.orders.find_one({"id": "o1"}), await db.ticket_outbox.count_documents({})
+
+    order, jobs = asyncio.run(run())
+    assert created == [{"channel_id": "c0", "channel_name": "ticket-o1"}]
+    assert attempts == [None, created[0]]
+    assert (order["ticket_status"], order["ticket_channel_id"], jobs) == ("created", "c0", 0)
+
+
+def test_failed_order_update_does_not_create_the_ticket_again():
+    db = AsyncMongoMockClient()["test"]
+    calls = []
+
+    async def create_ticket(order_id, on_created, **kwargs):
+        calls.append(order_id)
+        channel = {"channel_id": "c1", "channel_name": f"ticket-{order_id}"}
+        await on_created(channel)
+        return channel
+
+    outbox = TicketOutbox(db, create_ticket=create_ticket, lease_seconds=0)
+
+    async def run():
+        await db.orders.insert_one({"id": "o1", "ticket_status": "pending"})
+        await outbox.enqueue("o1", {})
+        async def unreachable(*args, **kwargs):
+            raise ConnectionError("Mongo unreachable")
+
+        update_one, outbox.orders.update_one = outbox.orders.update_one, unreachable
+        with pytest.raises(ConnectionError):
+            await outbox._process(await outbox._claim())
+        outbox.orders.update_one = update_one
+        # The lease has run out: another worker picks the job up
+        await outbox._process(await outbox._claim())
+        return await db.orders.find_one({"id": "o1"})
+
+    order = asyncio.run(run())
+    assert calls == ["o1"]
+    assert order["ticket_channel_id"] == "c1"
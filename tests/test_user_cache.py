@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from user_cache import UserCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    """Returns {"id": user_id}; each call waits on `release` when one is set"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = None
+
+    async def __call__(self, user_id):
+        self.calls.append(user_id)
+        if self.release is not None:
+            await self.release.wait()
+        return {"id": user_id, "version": len(self.calls)}
+
+
+def test_entries_expire_after_ttl():
+    clock, loader = Clock(), Loader()
+    cache = UserCache(loader, ttl=30, clock=clock)
+
+    async def run():
+        await cache.get("u1")
+        clock.now = 29
+        await cache.get("u1")
+        clock.now = 31
+        await cache.get("u1")
+
+    asyncio.run(run())
+    assert loader.calls == ["u1", "u1"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    loader = Loader()
+    cache = UserCache(loader, max_size=2)
+
+    async def run():
+        await cache.get("u1")
+        await cache.get("u2")
+        await cache.get("u1")
+        await cache.get("u3")
+        loader.calls.clear()
+        await cache.get("u1")
+        await cache.get("u2")
+
+    asyncio.run(run())
+    assert loader.calls == ["u2"]
+    assert cache.evictions == 2
+
+
+def test_invalidation_during_lookup_is_not_cached():
+    loader = Loader()
+    cache = UserCache(loader)
+
+    async def run():
+        loader.release = asyncio.Event()
+        lookup = asyncio.create_task(cache.get("u1"))
+        await asyncio.sleep(0)
+        cache.invalidate("u1")
+        loader.release.set()
+        await lookup
+        loader.release = None
+        return await cache.get("u1")
+
+    assert asyncio.run(run())["version"] == 2
+    assert loader.calls == ["u1", "u1"]
+
+
+def test_concurrent_misses_share_one_lookup():
+    loader = Loader()
+    cache = UserCache(loader)
+
+    async def run():
+        loader.release = asyncio.Event()
+        callers = [asyncio.create_task(cache.get("u1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        return await asyncio.gather(*callers)
+
+    docs = asyncio.run(run())
+    assert loader.calls == ["u1"]
+    assert all(doc == {"id": "u1", "version": 1} for doc in docs)
+    assert (cache.misses, cache.coalesced) == (1, 4)
+    # Callers get copies, not the cached document
+    docs[0]["id"] = "changed"
+    assert docs[1]["id"] == "u1"
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    loader = Loader()
+    cache = UserCache(loader)
+
+    async def run():
+        loader.release = asyncio.Event()
+        first = asyncio.create_task(cache.get("u1"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get("u1"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        loader.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run())["id"] == "u1"
+    assert loader.calls == ["u1"]